@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Per‑group render time with and without the shared frame atlas.
+
+Runs fully offline on a synthetic group::
+
+    python benchmarks/bench_atlas.py --students 6 --jobs 1
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "tg_bot")]
+
+from wheel_video_render.wheel_snapshot import GroupSnapshot  # noqa: E402
+from wheel_video_render.wheel_video_render import generate_group_videos  # noqa: E402
+
+
+def synthetic_snapshot(n: int, *, seed: int = 1, group: str = "bench") -> GroupSnapshot:
+    rng = random.Random(seed)
+    students = [
+        {"name": f"Студент{i:03d} Тестовый", "score": round(rng.uniform(0.25, 20.0), 2)}
+        for i in range(n)
+    ]
+    return GroupSnapshot.from_students(group, students)
+
+
+def _timed_run(snapshot: GroupSnapshot, *, atlas: bool, jobs: int) -> float:
+    t0 = time.perf_counter()
+    generate_group_videos(snapshot.group, snapshot=snapshot, atlas=atlas, jobs=jobs)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=6)
+    parser.add_argument("--jobs", type=int, default=1)
+    args = parser.parse_args()
+
+    snapshot = synthetic_snapshot(args.students)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Renderer expects ./static (logo) and writes to ./videos
+        os.symlink(ROOT / "static", pathlib.Path(tmp) / "static")
+        os.chdir(tmp)
+
+        results = {
+            "no atlas": _timed_run(snapshot, atlas=False, jobs=args.jobs),
+            "atlas (cold)": _timed_run(snapshot, atlas=True, jobs=args.jobs),
+            "atlas (warm)": _timed_run(snapshot, atlas=True, jobs=args.jobs),
+        }
+
+    print(f"\n{args.students} videos, jobs={args.jobs}")
+    base = results["no atlas"]
+    for label, sec in results.items():
+        print(f"  {label:<13} {sec:8.1f} s   ({base / sec:4.2f}× vs no atlas)")
+
+
+if __name__ == "__main__":
+    main()
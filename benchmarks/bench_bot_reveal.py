@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Load test of the /spin callback against a stubbed Telegram Bot API.
+
+Fires *N* simultaneous "spin" button presses through the bot's own update
+workers and records, per chat, when each Bot API call reaches the stub.
+Handler time (first → last API call of one callback) should stay flat as
+*N* grows – the handler no longer sleeps through the reveal – and every
+reveal should land ``REVEAL_DELAY_SEC`` after its video.  "done" is press →
+video for the last chat, i.e. how long the update workers stay busy, and
+"upload KB" the request bytes of all video sends (only the first press of
+a video uploads it; later ones reuse the cached ``file_id``)::
+
+    python benchmarks/bench_bot_reveal.py --spins 1 20 100 --delay 2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "tg_bot")]
+
+
+class TelegramStub:
+    """Answers every Bot API method with a plausible ``ok`` result."""
+
+    def __init__(self, *, latency_ms: float = 0.0) -> None:
+        self.latency_ms = latency_ms
+        self.events: Dict[str, Dict[int, float]] = {}
+        self.upload_bytes = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):  # noqa: N802 – http.server API
+                stub._handle(self)
+
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def api_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/bot{{0}}/{{1}}"
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handle(self, req: BaseHTTPRequestHandler) -> None:
+        n_bytes = len(req.rfile.read(int(req.headers.get("Content-Length") or 0)))
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        url = urllib.parse.urlsplit(req.path)
+        method = url.path.rsplit("/", 1)[-1]
+        query = urllib.parse.parse_qs(url.query)
+        chat_id = int(query.get("chat_id", ["0"])[0])
+        with self._lock:
+            self.events.setdefault(method, {})[chat_id] = time.perf_counter()
+            if method == "sendVideoNote":
+                self.upload_bytes += n_bytes
+
+        if method in ("sendMessage", "sendVideoNote"):
+            result = {"message_id": 1, "date": int(time.time()),
+                      "chat": {"id": chat_id, "type": "private"}}
+            if method == "sendVideoNote":
+                result["video_note"] = {"file_id": "stub-file-id", "file_unique_id": "u",
+                                        "length": 360, "duration": 1}
+        else:
+            result = True
+        payload = json.dumps({"ok": True, "result": result}).encode()
+        req.send_response(200)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(payload)))
+        req.end_headers()
+        req.wfile.write(payload)
+
+
+def _callback_update(update_id: int, chat_id: int, group: str) -> dict:
+    user = {"id": chat_id, "is_bot": False, "first_name": "Load"}
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(chat_id),
+            "data": f"spin:{group}",
+            "message": {"message_id": 1, "date": 0, "text": "?",
+                        "chat": {"id": chat_id, "type": "private"}},
+        },
+    }
+
+
+def _pct(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spins", type=int, nargs="+", default=[1, 20, 100])
+    parser.add_argument("--delay", type=float, default=2.0, help="reveal delay, seconds")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub API latency")
+    args = parser.parse_args()
+
+    os.environ["MATSTAT_REVEAL_DELAY_SEC"] = str(args.delay)
+    os.environ.setdefault("MATSTAT_LUCKY_WHEEL_BOT_TOKEN", "1:load-test")
+
+    stub = TelegramStub(latency_ms=args.latency_ms)
+    from telebot import apihelper, types
+
+    apihelper.API_URL = stub.api_url
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        from services.student_data import GROUPS
+        from tg_bot import bot as botmod
+
+        group = next(iter(GROUPS))
+        videos = pathlib.Path("videos") / group
+        videos.mkdir(parents=True)
+        (videos / "00_Тест_Студент_1.000000.mp4").write_bytes(b"\0" * 64 * 1024)
+
+        print(f"{'spins':>6} {'handler p50':>12} {'p95':>6} {'max':>6} "
+              f"{'done':>7} {'reveal lag p50':>15} {'max':>6} {'upload KB':>10}")
+        chat_base = 1000
+        for n in args.spins:
+            chats = range(chat_base, chat_base + n)
+            chat_base += n
+            uploaded = stub.upload_bytes
+            updates = [types.Update.de_json(_callback_update(c, c, group)) for c in chats]
+            t0 = time.perf_counter()
+            botmod.bot.process_new_updates(updates)
+
+            deadline = t0 + args.delay + 30 + n * args.latency_ms / 1000.0
+            while time.perf_counter() < deadline:
+                with stub._lock:
+                    done = sum(c in stub.events.get("sendMessage", {}) for c in chats)
+                if done == n:
+                    break
+                time.sleep(0.05)
+            else:
+                raise SystemExit(f"only {done}/{n} reveals arrived")
+
+            ev = stub.events
+            handler = [ev["sendVideoNote"][c] - ev["deleteMessage"][c] for c in chats]
+            done = max(ev["sendVideoNote"][c] for c in chats) - t0
+            lag = [ev["sendMessage"][c] - ev["sendVideoNote"][c] - args.delay for c in chats]
+            print(f"{n:6d} {_pct(handler, .5) * 1e3:12.0f} {_pct(handler, .95) * 1e3:6.0f} "
+                  f"{max(handler) * 1e3:6.0f} {done * 1e3:7.0f} "
+                  f"{statistics.median(lag) * 1e3:15.0f} {max(lag) * 1e3:6.0f} "
+                  f"{(stub.upload_bytes - uploaded) / 1024:10.0f}")
+
+        os.chdir(ROOT)
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
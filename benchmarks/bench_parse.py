@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""``parse_students`` (csv module) against the former pandas implementation.
+
+Checks that both produce identical rows on synthetic exports plus a set of
+edge cases, then times them::
+
+    python benchmarks/bench_parse.py --students 30 300 3000
+
+pandas is only needed here, not by the app; without it the parity check and
+the pandas column are skipped.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import pathlib
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "benchmarks")]
+
+from sheet_stub import N_COLUMNS, synthetic_csv  # noqa: E402
+from services.student_data import PRACTICE_COLUMNS, _parse_numeric, parse_students  # noqa: E402
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover – optional reference implementation
+    pd = None
+
+
+def parse_students_pandas(body: bytes) -> List[Dict[str, float]]:
+    """The previous ``pd.read_csv`` based parser, kept verbatim as the reference."""
+    from services.student_data import EXCLUDED
+
+    df = pd.read_csv(io.BytesIO(body))
+    students: list[dict[str, float]] = []
+    for idx in range(len(df)):
+        name = str(df.iloc[idx, 0]).strip()
+        if name is None or "nan" in name:
+            break
+        if name in EXCLUDED:
+            continue
+        row = df.iloc[idx]
+        score = sum(_parse_numeric(row.iloc[col]) for col in PRACTICE_COLUMNS)
+        if score == 0:
+            score += 0.25
+        students.append({"name": name, "score": round(score, 2)})
+    return students
+
+
+def _row(name: str, **cells: str) -> str:
+    out = [""] * N_COLUMNS
+    out[0] = name
+    for col, val in cells.items():
+        out[int(col[1:])] = val
+    return ",".join(out)
+
+
+def edge_cases() -> Dict[str, bytes]:
+    header = ",".join(["ФИО"] + [f"c{i}" for i in range(1, N_COLUMNS)])
+    cases = {
+        "bom": "﻿" + header + "\n" + _row("Аня", c9="2") + "\n",
+        "blank-lines": header + "\n\n" + _row("Аня", c9="1") + "\n\n" + _row("Боря") + "\n",
+        "na-name": header + "\n" + _row("Аня", c9="1") + "\n" + _row("NA") + "\n" + _row("Боря") + "\n",
+        "nan-substring": header + "\n" + _row("Аня") + "\n" + _row("Ананас", c9="1") + "\n",
+        "padded-name": header + "\n" + _row("  Аня  ", c9="3") + "\n",
+        "excluded": header + "\n" + _row("Грехов Егор", c9="3") + "\n" + _row("Аня") + "\n",
+        "decimals": header + "\n" + _row("Аня", c9='"1,5"', c11="2.25", c13="-1", c15="x") + "\n",
+        "short-row": header + "\n" + "Аня,,,,,,,,,2\n" + _row("Боря", c35="3") + "\n",
+        "quoted-newline": header + "\n" + _row('"Аня\nБ"', c9="1") + "\n",
+        "header-only": header + "\n",
+    }
+    return {k: v.encode("utf-8") for k, v in cases.items()}
+
+
+def _best_of(fn: Callable[[bytes], object], body: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(body)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, nargs="+", default=[30, 300, 3000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = {f"synthetic-{n}": synthetic_csv(n, seed=n) for n in args.students}
+    if pd is not None:
+        for label, body in {**edge_cases(), **bodies}.items():
+            got, want = parse_students(body), parse_students_pandas(body)
+            assert got == want, f"{label}: {got[:3]} != {want[:3]}"
+        print(f"[bench-parse] parity ok on {len(bodies) + len(edge_cases())} inputs")
+    else:
+        print("[bench-parse] pandas not installed – parity check skipped")
+
+    print(f"{'input':>16} {'csv ms':>9} {'pandas ms':>10} {'speed-up':>9}")
+    for label, body in bodies.items():
+        fast = _best_of(parse_students, body, args.repeat) * 1000
+        if pd is None:
+            print(f"{label:>16} {fast:9.3f} {'-':>10} {'-':>9}")
+            continue
+        slow = _best_of(parse_students_pandas, body, args.repeat) * 1000
+        print(f"{label:>16} {fast:9.3f} {slow:10.3f} {slow / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Spin pick cost: directory scan + filename parsing vs. manifest alias table.
+
+Builds a throw‑away ``videos/<group>`` with *N* empty MP4s named like the
+renderer names them plus a ``manifest.json``, checks that the alias table
+reproduces the weights, then times both pickers::
+
+    python benchmarks/bench_pick.py --students 30 --picks 20000
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "tg_bot")]
+
+from wheel_video_render.wheel_manifest import ManifestCache, write_manifest  # noqa: E402
+
+
+def _scan_pick(dir_path: pathlib.Path) -> pathlib.Path:
+    """The per‑spin work of the filename‑based picker."""
+    videos = [p for p in dir_path.glob("*.mp4") if not p.stem.endswith("_new")]
+    weights = []
+    for p in videos:
+        try:
+            weights.append(float(p.stem.split("_")[-1]))
+        except ValueError:
+            weights.append(0.0)
+    return random.choices(videos, weights=weights, k=1)[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--picks", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    raw = [rng.uniform(0.25, 20.0) for _ in range(args.students)]
+    weights = [w / sum(raw) for w in raw]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        group_dir = pathlib.Path(tmp) / "bench"
+        group_dir.mkdir()
+        entries = []
+        for i, w in enumerate(weights):
+            name = f"Студент{i:03d} Тестовый"
+            file = f"{i:02d}_{name.replace(' ', '_')}_{w:.6f}.mp4"
+            (group_dir / file).touch()
+            entries.append({"file": file, "name": name, "prob": w, "angle": 0.0})
+        write_manifest(group_dir, group="bench", version="bench", kind="students", videos=entries)
+        cache = ManifestCache(tmp)
+
+        # Alias sampling must reproduce the weights
+        counts = collections.Counter(cache.get("bench").pick()[1] for _ in range(args.picks))
+        worst = max(abs(counts[e["name"]] / args.picks - e["prob"]) for e in entries)
+        tolerance = 4.0 / args.picks ** 0.5
+        assert worst < tolerance, f"alias frequencies off by {worst:.4f}"
+        print(f"[bench-pick] alias frequencies within {worst:.4f} of the weights")
+
+        t0 = time.perf_counter()
+        for _ in range(args.picks):
+            _scan_pick(group_dir)
+        scan = (time.perf_counter() - t0) / args.picks
+
+        t0 = time.perf_counter()
+        for _ in range(args.picks):
+            cache.get("bench").pick()
+        alias = (time.perf_counter() - t0) / args.picks
+
+    print(f"scan + parse : {scan * 1e6:8.1f} µs/pick")
+    print(f"manifest     : {alias * 1e6:8.1f} µs/pick ({scan / alias:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
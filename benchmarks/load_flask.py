@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Lecture‑style load test of the Flask app against a stub sheet server.
+
+Starts :class:`sheet_stub.SheetStub` (configurable latency / failures),
+points ``services.student_data`` at it, serves ``main.app`` on a local
+threaded WSGI server and lets *concurrency* simulated students each open
+``/<group>`` and then poll ``/next-message`` until *duration* is over.
+Per route it prints request count, throughput, error rate and
+p50 / p95 / p99 / max latency::
+
+    python benchmarks/load_flask.py --concurrency 50 --duration 20 \\
+        --latency-ms 300 --jitter-ms 200 --failure-rate 0.05
+
+``--url http://host:5000`` drives an already running server instead
+(nothing is started; the sheet options are then ignored).  Client and
+server share one interpreter otherwise, so on few cores the numbers are
+a lower bound.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import math
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "benchmarks")]
+
+from sheet_stub import SheetStub, synthetic_csv  # noqa: E402
+
+# (route, status or 0 on connection error, seconds)
+Sample = Tuple[str, int, float]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest‑rank percentile of an ascending list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ---------------------------------------------------------------------------
+# in‑process app + stub
+# ---------------------------------------------------------------------------
+
+def start_app(args: argparse.Namespace) -> Tuple[str, SheetStub, object]:
+    stub = SheetStub(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+    ).start()
+    os.environ["MATSTAT_SHEET_URL_TEMPLATE"] = stub.url_template
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    import main
+    import services.sheet_store as sheet_store
+    import services.student_data as student_data
+    from services.student_data import GROUPS
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):  # one line per request drowns the report
+            pass
+
+    for i, gid in enumerate(GROUPS.values()):
+        stub.set_body(gid, synthetic_csv(args.students, seed=i))
+    # Private cache dir: no state shared with a real deployment on this box
+    sheet_store.store = sheet_store.SheetStore(pathlib.Path(tempfile.mkdtemp()))
+    if args.cache_ttl is not None:
+        student_data.CACHE_TTL_SEC = args.cache_ttl
+
+    server = make_server("127.0.0.1", 0, main.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", stub, server
+
+
+# ---------------------------------------------------------------------------
+# simulated students
+# ---------------------------------------------------------------------------
+
+class _Client:
+    """One keep‑alive connection, reopened whenever the server closes it."""
+
+    def __init__(self, base: str, timeout: float) -> None:
+        parts = urllib.parse.urlsplit(base)
+        self.host, self.port = parts.hostname or "127.0.0.1", parts.port or 80
+        self.timeout = timeout
+        self.conn: http.client.HTTPConnection | None = None
+
+    def get(self, path: str) -> int:
+        for attempt in (0, 1):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request("GET", path)
+                resp = self.conn.getresponse()
+                resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.conn.close()
+                self.conn = None
+                if attempt == 0:
+                    continue
+                raise
+            if resp.will_close:
+                self.conn.close()
+                self.conn = None
+            return resp.status
+        raise AssertionError("unreachable")
+
+
+def _student(
+    base: str,
+    groups: List[str],
+    args: argparse.Namespace,
+    deadline: float,
+    out: List[Sample],
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    client = _Client(base, args.timeout)
+    group = rng.choice(groups)
+    while time.monotonic() < deadline:
+        for route, path in [("/<group>", f"/{group}")] + [
+            ("/next-message", "/next-message")
+        ] * args.messages_per_page:
+            if time.monotonic() >= deadline:
+                return
+            t0 = time.perf_counter()
+            try:
+                status = client.get(path)
+            except OSError:
+                status = 0
+                client.conn = None
+            out.append((route, status, time.perf_counter() - t0))
+            if args.think_ms > 0:
+                time.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000.0)
+
+
+def run_load(base: str, groups: List[str], args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    samples: List[List[Sample]] = [[] for _ in range(args.concurrency)]
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=_student, args=(base, groups, args, deadline, samples[i], i), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    by_route: Dict[str, List[Sample]] = {}
+    for per_thread in samples:
+        for s in per_thread:
+            by_route.setdefault(s[0], []).append(s)
+
+    report: Dict[str, Dict[str, float]] = {}
+    for route, rows in sorted(by_route.items()):
+        lat = sorted(s[2] for s in rows)
+        errors = sum(1 for s in rows if s[1] == 0 or s[1] >= 500)
+        report[route] = {
+            "requests": len(rows),
+            "rps": round(len(rows) / elapsed, 1),
+            "error_rate": round(errors / len(rows), 4),
+            "p50_ms": round(percentile(lat, 50) * 1000, 2),
+            "p95_ms": round(percentile(lat, 95) * 1000, 2),
+            "p99_ms": round(percentile(lat, 99) * 1000, 2),
+            "max_ms": round(lat[-1] * 1000, 2),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="target a running server instead")
+    parser.add_argument("--concurrency", type=int, default=30, help="simultaneous students")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load")
+    parser.add_argument("--messages-per-page", type=int, default=5,
+                        help="/next-message calls after each page load")
+    parser.add_argument("--think-ms", type=float, default=0.0,
+                        help="mean pause between a student's requests")
+    parser.add_argument("--groups", nargs="*", default=None, help="groups to open (default: all)")
+    parser.add_argument("--students", type=int, default=30, help="rows per stub sheet")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stub sheet latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="stub 500 probability")
+    parser.add_argument("--cache-ttl", type=float, default=None,
+                        help="override the student cache TTL (s) so sheets revalidate under load")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout (s)")
+    parser.add_argument("--json", default=None, help="also write the report to this path")
+    args = parser.parse_args()
+
+    stub = None
+    if args.url:
+        base = args.url.rstrip("/")
+    else:
+        base, stub, _server = start_app(args)
+
+    sys.path.insert(0, str(ROOT))
+    from services.student_data import GROUPS
+
+    groups = args.groups or list(GROUPS)
+    print(f"[load] {args.concurrency} students × {args.duration:.0f}s against {base} "
+          f"(sheet latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+          f"failures {args.failure_rate:.0%})")
+    report = run_load(base, groups, args)
+
+    print(f"\n{'route':<16}{'req':>8}{'req/s':>9}{'err':>8}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for route, r in report.items():
+        print(f"{route:<16}{r['requests']:>8}{r['rps']:>9.1f}{r['error_rate']:>8.1%}"
+              f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['max_ms']:>10.1f}")
+    if stub is not None:
+        print(f"\nsheet stub hits: {stub.hits}")
+
+    if args.json:
+        pathlib.Path(args.json).write_text(
+            json.dumps({"args": vars(args), "routes": report}, indent=1), encoding="utf-8"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""Offline micro‑benchmarks of the wheel data and render hot paths.
+
+Every case runs on synthetic fixtures (generated CSVs, synthetic groups,
+a local sheet stub), so no network and no real spreadsheet are needed.
+Results are written as JSON; two runs (e.g. two commits) compare with a
+regression threshold on the time per call (best of the samples by
+default – the least noisy on a shared machine)::
+
+    python benchmarks/run.py --out base.json
+    git checkout feature && python benchmarks/run.py --out new.json --compare base.json
+
+``--filter`` takes a regex over case names, ``--quick`` skips the slow
+end‑to‑end render.  Exit status 1 means at least one case regressed.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import pathlib
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "tg_bot"), str(ROOT / "benchmarks")]
+
+from bench_atlas import synthetic_snapshot  # noqa: E402
+from sheet_stub import SheetStub, synthetic_csv  # noqa: E402
+
+from services.http_pool import pool as http_pool  # noqa: E402
+from services.sheet_store import SheetStore  # noqa: E402
+from services.student_data import GROUPS, _parse_numeric, parse_students  # noqa: E402
+from wheel_video_render.wheel_atlas import FrameAtlas  # noqa: E402
+from wheel_video_render.wheel_draw import draw_rotating_layer, draw_static_overlay  # noqa: E402
+from wheel_video_render.wheel_helpers import weights  # noqa: E402
+from wheel_video_render.wheel_polar import PolarRotator, pil_frame  # noqa: E402
+from wheel_video_render.wheel_segment import segment_bounds  # noqa: E402
+from wheel_video_render.wheel_snapshot import GroupSnapshot  # noqa: E402
+from wheel_video_render.wheel_video_render import SIZE_PX, render_segment_video  # noqa: E402
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+# Slower than the baseline by more than this fraction → regression
+DEFAULT_THRESHOLD: float = 0.10
+METRICS = ("min_s", "median_s")
+SIZES = (30, 300, 3000)
+
+
+# The timed call, or (timed call, teardown) for fixtures that must be undone
+Fixture = Union[Callable[[], Any], Tuple[Callable[[], Any], Callable[[], None]]]
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Fixture]   # builds fixtures, returns the timed call
+    repeat: int = 5
+    slow: bool = False
+
+
+# ---------------------------------------------------------------------------
+# cases
+# ---------------------------------------------------------------------------
+
+def _scratch() -> pathlib.Path:
+    """Fresh directory inside the run's working dir (removed with it)."""
+    return pathlib.Path(tempfile.mkdtemp(dir="."))
+
+
+def _cells(n: int = 1000) -> Callable[[], Any]:
+    rng = random.Random(3)
+    pool = ["", "0", "2", "1,5", "2.75", "н", "NaN", " 3 ", "abc", "1,25"]
+    cells = [rng.choice(pool) for _ in range(n)]
+    return lambda: [_parse_numeric(c) for c in cells]
+
+
+def _parse(n: int) -> Callable[[], Any]:
+    body = synthetic_csv(n, seed=n)
+    return lambda: parse_students(body)
+
+
+def _fetch(n: int, *, conditional: bool) -> Fixture:
+    """One ``SheetStore`` lookup against the local stub: 200 + parse, or 304."""
+    import services.student_data as sd
+
+    stub = SheetStub().start()
+    saved_template = sd.SHEET_URL_TEMPLATE
+
+    def teardown() -> None:
+        sd.SHEET_URL_TEMPLATE = saved_template
+        http_pool.close()  # idle keep‑alives would pin the stub's handler threads
+        stub.stop()
+
+    group, gid = next(iter(GROUPS.items()))
+    stub.set_body(gid, synthetic_csv(n, seed=n))
+    sd.SHEET_URL_TEMPLATE = stub.url_template
+    try:
+        warm = SheetStore(cache_dir=None, fresh_sec=0.0)
+        warm.get(group)
+    except BaseException:
+        teardown()
+        raise
+    if conditional:
+        return (lambda: warm.get(group)), teardown  # validators sent → 304, body kept
+    return (lambda: SheetStore(cache_dir=None, fresh_sec=0.0).get(group)), teardown
+
+
+def _students(n: int) -> List[Dict[str, float]]:
+    return synthetic_snapshot(n).students
+
+
+def _snapshot(n: int) -> Callable[[], Any]:
+    students = _students(n)
+    return lambda: GroupSnapshot.from_students("bench", students)
+
+
+def _weights(n: int) -> Callable[[], Any]:
+    students = _students(n)
+    return lambda: weights(students)
+
+
+def _bounds(n: int) -> Callable[[], Any]:
+    snapshot = synthetic_snapshot(n)
+    return lambda: segment_bounds(snapshot)
+
+
+def _draw_rotating(n: int) -> Callable[[], Any]:
+    snapshot = synthetic_snapshot(n)
+    return lambda: draw_rotating_layer(snapshot)
+
+
+def _layers() -> tuple[Image.Image, Image.Image]:
+    snapshot = synthetic_snapshot(30)
+    rot = Image.open(io.BytesIO(draw_rotating_layer(snapshot))).convert("RGBA")
+    ovl = Image.open(io.BytesIO(draw_static_overlay())).convert("RGBA")
+    return rot, ovl
+
+
+def _frames(engine: str) -> Callable[[], Any]:
+    rot, ovl = _layers()
+    angles = iter(random.Random(5).uniform(0, 360) for _ in range(10 ** 7))
+    if engine == "polar":
+        frame = PolarRotator(rot, ovl, SIZE_PX).frame
+    elif engine == "pil":
+        frame = lambda theta: pil_frame(rot, ovl, theta, SIZE_PX)
+    else:  # atlas hit: every slot pre‑rendered, lookups only
+        rotator = PolarRotator(rot, ovl, SIZE_PX)
+        atlas = FrameAtlas(_scratch() / "bench", SIZE_PX, lambda: rotator.frame)
+        rng = random.Random(5)
+        slots = atlas.indices(np.array([rng.uniform(0, 360) for _ in range(64)]))
+        for slot in slots:
+            atlas.frame_at(int(slot))
+        hits = iter(slots.tolist() * 10 ** 5)
+        # Copy out: a memmap slice is a lazy view, the pixels are read here
+        return lambda: np.array(atlas.frame_at(int(next(hits))))
+    return lambda: frame(next(angles))
+
+
+def _render_clip() -> Callable[[], Any]:
+    snapshot = synthetic_snapshot(6)
+    out = _scratch() / "clip.mp4"
+    return lambda: render_segment_video(snapshot, 0, seed=1, out_file=out, logger=None)
+
+
+CASES: List[Case] = [
+    Case("parse/_parse_numeric[1000 cells]", _cells),
+    *[Case(f"parse/parse_students[{n}]", lambda n=n: _parse(n)) for n in SIZES],
+    *[Case(f"fetch/fetch_200[{n}]", lambda n=n: _fetch(n, conditional=False)) for n in SIZES],
+    Case("fetch/fetch_304[300]", lambda: _fetch(300, conditional=True)),
+    *[Case(f"segment/weights[{n}]", lambda n=n: _weights(n)) for n in SIZES],
+    *[Case(f"segment/segment_bounds[{n}]", lambda n=n: _bounds(n)) for n in SIZES],
+    *[Case(f"segment/snapshot[{n}]", lambda n=n: _snapshot(n)) for n in SIZES],
+    Case("draw/rotating_layer[30]", lambda: _draw_rotating(30), repeat=3),
+    Case("draw/static_overlay", lambda: draw_static_overlay, repeat=3),
+    Case("frame/polar", lambda: _frames("polar")),
+    Case("frame/pil", lambda: _frames("pil")),
+    Case("frame/atlas_hit", lambda: _frames("atlas")),
+    Case("render/segment_video[6]", _render_clip, repeat=1, slow=True),
+]
+
+
+# ---------------------------------------------------------------------------
+# runner
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Per‑call seconds: loops auto‑ranged to ≥ 0.2 s, *repeat* samples."""
+    timer = timeit.Timer(fn)
+    loops, first = timer.autorange()
+    samples = [first] + (timer.repeat(repeat - 1, loops) if repeat > 1 else [])
+    per_call = sorted(t / loops for t in samples)
+    return {
+        "median_s": per_call[len(per_call) // 2],
+        "min_s": per_call[0],
+        "loops": loops,
+        "repeat": len(per_call),
+    }
+
+
+def _run_cases(cases: List[Case]) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for case in cases:
+        fixture = case.setup()
+        fn, teardown = fixture if isinstance(fixture, tuple) else (fixture, None)
+        try:
+            res = measure(fn, case.repeat)
+        finally:
+            if teardown is not None:
+                teardown()
+        results[case.name] = res
+        print(f"{case.name:<36}{_fmt(res['median_s']):>12}  (min {_fmt(res['min_s'])}, "
+              f"{res['loops']}×{res['repeat']})", flush=True)
+    return results
+
+
+def _meta() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(
+    base: Dict[str, Any],
+    new: Dict[str, Any],
+    threshold: float,
+    metric: str = "min_s",
+) -> List[str]:
+    """Print a side‑by‑side table of *metric*; return the names of regressed cases."""
+    regressed: List[str] = []
+    print(f"\n{'case':<36}{'base':>12}{'new':>12}{'change':>10}")
+    for name, res in new["results"].items():
+        old = base.get("results", {}).get(name)
+        if old is None:
+            print(f"{name:<36}{'–':>12}{_fmt(res[metric]):>12}{'new':>10}")
+            continue
+        ratio = res[metric] / old[metric] - 1.0
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<36}{_fmt(old[metric]):>12}{_fmt(res[metric]):>12}{ratio:>+9.1%}{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def _fmt(sec: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if sec >= scale:
+            return f"{sec / scale:.2f} {unit}"
+    return f"{sec / 1e-9:.0f} ns"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=None, help="write results as JSON to this path")
+    parser.add_argument("--compare", default=None, metavar="BASE",
+                        help="compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown (fraction) flagged as a regression")
+    parser.add_argument("--metric", choices=METRICS, default="min_s",
+                        help="per‑call time compared against the baseline")
+    parser.add_argument("--filter", default="", help="regex over case names")
+    parser.add_argument("--quick", action="store_true", help="skip the slow end‑to‑end render")
+    args = parser.parse_args()
+
+    pattern = re.compile(args.filter)
+    cases = [c for c in CASES if pattern.search(c.name) and not (args.quick and c.slow)]
+    # Relative to where the script was started, not the scratch dir below
+    out = pathlib.Path(args.out).resolve() if args.out else None
+    base_path = pathlib.Path(args.compare).resolve() if args.compare else None
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Drawing expects ./static (logo); anything written stays in tmp
+        os.symlink(ROOT / "static", pathlib.Path(tmp) / "static")
+        os.chdir(tmp)
+        try:
+            results = _run_cases(cases)
+        finally:
+            os.chdir(cwd)
+
+    report = {"meta": _meta(), "results": results}
+    if out is not None:
+        out.write_text(json.dumps(report, indent=1), encoding="utf-8")
+
+    if base_path is not None:
+        base = json.loads(base_path.read_text(encoding="utf-8"))
+        regressed = compare(base, report, args.threshold, args.metric)
+        if regressed:
+            print(f"\n{len(regressed)} case(s) slower than {args.threshold:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
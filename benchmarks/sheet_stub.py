@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Local stand‑in for the Google Sheets CSV export.
+
+Serves synthetic CSVs per ``gid`` with ``ETag`` / ``Last-Modified`` and
+answers conditional requests with ``304``.  Latency and failure rate are
+configurable, so it doubles as the backend for load tests.  Point the app
+at it with::
+
+    MATSTAT_SHEET_URL_TEMPLATE="http://127.0.0.1:8765/{sheet_id}/export?gid={gid}"
+
+``python benchmarks/sheet_stub.py --self-check`` exercises the snapshot
+store (download → 304 → change) against a throw‑away stub.
+"""
+from __future__ import annotations
+
+import argparse
+import email.utils
+import hashlib
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+# Zero‑based score columns – keep in sync with services.student_data
+PRACTICE_COLUMNS = [9, 11, 13, 15, 17, 20, 22, 24, 26, 29, 31, 33, 35]
+N_COLUMNS = 40
+
+
+def synthetic_csv(n_students: int, *, seed: int = 0) -> bytes:
+    """A sheet export shaped like the real one (header, names, scores, tail)."""
+    rng = random.Random(seed)
+    lines = [",".join(["ФИО"] + [f"c{i}" for i in range(1, N_COLUMNS)])]
+    for i in range(n_students):
+        cells = [""] * N_COLUMNS
+        cells[0] = f"Студент{i:04d} Тестовый"
+        for col in PRACTICE_COLUMNS:
+            r = rng.random()
+            if r < 0.15:
+                continue  # empty cell
+            cells[col] = f'"{rng.randint(0, 3)},{rng.choice([0, 25, 5, 75])}"' if r < 0.4 else str(rng.randint(0, 3))
+        lines.append(",".join(cells))
+    lines.append("," * (N_COLUMNS - 1))   # first empty name ends the list
+    lines.append("Итого" + "," * (N_COLUMNS - 1))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class SheetStub:
+    """Threaded HTTP server holding one CSV body per gid."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        failure_rate: float = 0.0,
+    ) -> None:
+        self.bodies: Dict[str, bytes] = {}
+        self._modified: Dict[str, float] = {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.hits = {"200": 0, "304": 0, "500": 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep‑alive
+            # Headers and body go out in two writes – without this, Nagle +
+            # delayed ACK add ~40 ms to every 200 on a kept‑alive connection
+            disable_nagle_algorithm = True
+
+            def do_GET(self):  # noqa: N802 – http.server API
+                stub._handle(self)
+
+            def log_message(self, *args):  # silence per‑request logging
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    # ------------------------------------------------------------------
+    @property
+    def url_template(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/{{sheet_id}}/export?format=csv&gid={{gid}}"
+
+    def set_body(self, gid: str, body: bytes) -> None:
+        with self._lock:
+            self.bodies[gid] = body
+            self._modified[gid] = time.time()
+
+    def start(self) -> "SheetStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ------------------------------------------------------------------
+    def _handle(self, req: BaseHTTPRequestHandler) -> None:
+        delay = self.latency_ms + self._rng.uniform(0.0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        gid = urllib.parse.parse_qs(urllib.parse.urlparse(req.path).query).get("gid", [""])[0]
+        with self._lock:
+            body = self.bodies.get(gid)
+            modified = self._modified.get(gid, 0.0)
+            fail = self._rng.random() < self.failure_rate
+
+        if fail or body is None:
+            code = 500 if fail else 404
+            with self._lock:
+                self.hits["500"] += fail
+            req.send_response(code)
+            req.send_header("Content-Length", "0")
+            req.end_headers()
+            return
+
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if req.headers.get("If-None-Match") == etag:
+            with self._lock:
+                self.hits["304"] += 1
+            req.send_response(304)
+            req.send_header("ETag", etag)
+            req.send_header("Content-Length", "0")
+            req.end_headers()
+            return
+
+        with self._lock:
+            self.hits["200"] += 1
+        req.send_response(200)
+        req.send_header("Content-Type", "text/csv; charset=utf-8")
+        req.send_header("ETag", etag)
+        req.send_header("Last-Modified", email.utils.formatdate(modified, usegmt=True))
+        req.send_header("Content-Length", str(len(body)))
+        req.end_headers()
+        req.wfile.write(body)
+
+
+# ---------------------------------------------------------------------------
+# self‑check: conditional GET through services.sheet_store
+# ---------------------------------------------------------------------------
+
+def _self_check() -> None:
+    import os
+    import pathlib
+    import sys
+    import tempfile
+
+    stub = SheetStub().start()
+    os.environ["MATSTAT_SHEET_URL_TEMPLATE"] = stub.url_template
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+    from services.student_data import GROUPS
+    from services.sheet_store import SheetStore
+
+    group, gid = next(iter(GROUPS.items()))
+    stub.set_body(gid, synthetic_csv(30, seed=1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SheetStore(pathlib.Path(tmp), fresh_sec=0.0)
+        first = store.get(group)
+        again = store.get(group)
+        assert stub.hits == {"200": 1, "304": 1, "500": 0}, stub.hits
+        assert again.md5 == first.md5 and again.students is first.students
+
+        # A restarted process revalidates from the persisted copy
+        restarted = SheetStore(pathlib.Path(tmp), fresh_sec=0.0).get(group)
+        assert stub.hits["304"] == 2 and restarted.md5 == first.md5
+
+        stub.set_body(gid, synthetic_csv(31, seed=2))
+        changed = store.get(group)
+        assert changed.md5 != first.md5 and len(changed.students) == 31
+
+    stub.stop()
+    print(f"[sheet-stub] self‑check passed: {stub.hits}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve synthetic sheet CSV exports.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--self-check", action="store_true")
+    args = parser.parse_args()
+
+    if args.self_check:
+        _self_check()
+        return
+
+    import pathlib
+    import sys
+
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+    from services.student_data import GROUPS
+
+    stub = SheetStub(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+    )
+    for i, gid in enumerate(GROUPS.values()):
+        stub.set_body(gid, synthetic_csv(args.students, seed=i))
+    print(f"[sheet-stub] serving {len(GROUPS)} groups; MATSTAT_SHEET_URL_TEMPLATE={stub.url_template}")
+    stub.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
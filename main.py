@@ -1,50 +1,178 @@
 from __future__ import annotations
 
-import random, threading
-from flask import Flask, render_template, abort, jsonify
+import functools, hashlib, json, os, pathlib, random, time
+from typing import Dict, List, Tuple
+from flask import Flask, Response, render_template, abort, g, jsonify, request, session
 
-from services.student_data import fetch_students, GROUPS  # NEW unified data layer
+from services import static_assets
+from services.metrics import CONTENT_TYPE, exposition, histogram
+from services.student_data import get_snapshot_cached, warm_up, GROUPS  # NEW unified data layer
 from quotes import MESSAGES
 
 app = Flask(__name__, static_folder="static", static_url_path="/static")
 app.secret_key = "your_secret_key_here"
+# url_for('static', …) → content‑hashed names from static_dist/manifest.json
+static_assets.init_app(app)
+
+# Labelled by URL rule (not path) so every group shares one series per status
+_REQUEST_SECONDS = histogram(
+    "matstat_http_request_seconds", "Flask request latency", ["route", "method", "status"]
+)
+
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        _REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=rule, method=request.method, status=response.status_code,
+        )
+    return response
+
+
+@app.route("/metrics")
+def metrics():
+    # Own registry plus the snapshots the bot drops into services/sheet_cache/metrics
+    return Response(exposition("flask"), content_type=CONTENT_TYPE)
+
+
+# ---------------------------------------------------------------------------
+# Wheel page + students JSON – cached per data version, revalidated by ETag
+# ---------------------------------------------------------------------------
+
+# group → (sheet md5, students version, formatted students, JSON body)
+_payloads: Dict[str, Tuple[str, str, List[dict], bytes]] = {}
+# group → (page ETag, rendered HTML); re‑rendered only when the ETag moves
+_pages: Dict[str, Tuple[str, str]] = {}
+# A deploy with a changed template must not be answered with 304
+_TEMPLATE_VERSION = hashlib.sha256(
+    pathlib.Path(app.root_path, "templates", "wheel.html").read_bytes()
+).hexdigest()[:8]
+
+
+def _students_payload(group: str) -> Tuple[str, List[dict], bytes]:
+    """(version, students, JSON body) of *group*, recomputed only when the sheet changes."""
+    snap = get_snapshot_cached(group)  # TTL + stale‑while‑revalidate cache
+    cached = _payloads.get(group)
+    if cached is None or cached[0] != snap.md5:
+        # Format for JS front‑end (keep only the data it actually needs)
+        formatted = [{"name": s["name"], "score": round(s["score"], 2)} for s in snap.students]
+        version = hashlib.sha256(
+            json.dumps(formatted, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+        body = json.dumps(
+            {"group": group, "version": version, "students": formatted}, ensure_ascii=False
+        ).encode("utf-8")
+        cached = _payloads[group] = (snap.md5, version, formatted, body)
+    return cached[1], cached[2], cached[3]
+
+
+def _conditional(body, etag: str, mimetype: str) -> Response:
+    """*body* with a strong ETag; ``304`` when the client already has it."""
+    resp = Response(body, mimetype=mimetype)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"  # always revalidate, usually 304
+    return resp.make_conditional(request)
+
 
 @app.route("/<group_name>")
 def wheel_of_fortune(group_name: str):
     if group_name not in GROUPS:
         abort(404)
 
-    students = fetch_students(group_name)
+    version, students, _ = _students_payload(group_name)
     if not students:
         return "Нет данных о студентах", 500
 
-    # Format for JS front‑end (keep only the data it actually needs)
-    formatted = [{"name": s["name"], "score": round(s["score"], 2)} for s in students]
-    return render_template("wheel.html", students=formatted)
+    etag = f"{version}-{static_assets.manifest().version or 'src'}-{_TEMPLATE_VERSION}"
+    page = _pages.get(group_name)
+    if page is None or page[0] != etag:
+        html = render_template(
+            "wheel.html", students=students, group=group_name, students_version=version
+        )
+        page = _pages[group_name] = (etag, html)
+    return _conditional(page[1], etag, "text/html")
+
+
+@app.route("/api/students/<group_name>")
+def students_json(group_name: str):
+    """Current students of *group_name*; lets an open wheel page refresh itself."""
+    if group_name not in GROUPS:
+        abort(404)
+
+    version, _, body = _students_payload(group_name)
+    return _conditional(body, version, "application/json")
+
 
 @app.route("/")
 def main_page():
     return render_template("main.html")
 
 
-last_index = {"value": -1}
-lock = threading.Lock()
+# ---------------------------------------------------------------------------
+# Quotes – per‑session shuffle‑bag
+# ---------------------------------------------------------------------------
+
+# Every session walks a shuffled order of all MESSAGES before any repeats.
+# Only (seed, position, bag size) lives in the signed session cookie – the
+# order itself is derived from the seed – so there is no shared state and
+# no lock between requests.
+QUOTE_BATCH_MAX = 10
 
-@app.route("/next-message")
-def next_message():
-    with lock:
-        available = list(range(len(MESSAGES)))
-        if last_index["value"] in available:
-            available.remove(last_index["value"])
 
-        if not available:
-            available = list(range(len(MESSAGES)))
+@functools.lru_cache(maxsize=1024)
+def _bag_order(seed: int, size: int) -> tuple:
+    order = list(range(size))
+    random.Random(seed).shuffle(order)
+    return tuple(order)
 
-        idx = random.choice(available)
-        last_index["value"] = idx
 
+def _draw_quotes(count: int) -> list:
+    """Indices of the session's next *count* messages, advancing its bag."""
+    size = len(MESSAGES)
+    seed, pos, bag_size = session.get("quote_bag") or (0, size, size)
+    if bag_size != size:
+        pos = size  # MESSAGES changed since – start a fresh bag
+
+    picked = []
+    while len(picked) < count:
+        if pos >= size:
+            # New bag; never open it with the message that closed the last one
+            previous = _bag_order(seed, size)[-1] if "quote_bag" in session or picked else None
+            seed = random.getrandbits(32)
+            while size > 1 and _bag_order(seed, size)[0] == previous:
+                seed = random.getrandbits(32)
+            pos = 0
+        picked.append(_bag_order(seed, size)[pos])
+        pos += 1
+
+    session["quote_bag"] = [seed, pos, size]
+    return picked
+
+
+@app.route("/next-message")
+def next_message():
+    idx, = _draw_quotes(1)
     return jsonify({"message": MESSAGES[idx]})
 
 
+@app.route("/next-messages")
+def next_messages():
+    """The next ``n`` (≤ QUOTE_BATCH_MAX) messages, for prefetching clients."""
+    count = max(1, min(request.args.get("n", 5, type=int), QUOTE_BATCH_MAX))
+    return jsonify({"messages": [MESSAGES[i] for i in _draw_quotes(count)]})
+
+
 if __name__ == "__main__":
+    if os.getenv("MATSTAT_BUILD_STATIC", "1") == "1":
+        static_assets.build()  # hashed + pre‑compressed copies for nginx
+    if os.getenv("MATSTAT_WARM_CACHE", "1") == "1":
+        warm_up()  # fill the student cache for every group in the background
     app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+__all__ = ["atomic_write", "try_atomic_write"]
+
+
+def atomic_write(path: str | os.PathLike, data: bytes | str) -> None:
+    """Replace *path* with *data* (``str`` → UTF‑8) in one rename.
+
+    Readers – in this or another process – see the old file or the new one,
+    never a torn mix.  The temporary name is unique per process and thread,
+    so concurrent writers of one path never share it; missing parent
+    directories are created.
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def try_atomic_write(path: str | os.PathLike, data: bytes | str) -> bool:
+    """:func:`atomic_write` for caches and state files: ``False`` instead of
+    :class:`OSError`, so an unwritable directory just means memory only."""
+    try:
+        atomic_write(path, data)
+    except OSError:
+        return False
+    return True
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+__all__ = ["Change", "GroupState", "ChangeStore", "diff_students"]
+
+# Next to the sheet cache, i.e. on the volume every container shares
+DB_PATH: Path = Path(__file__).with_name("sheet_cache") / "changes.sqlite3"
+BUSY_TIMEOUT_MS: int = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    grp         TEXT PRIMARY KEY,
+    hash        TEXT NOT NULL,
+    students    TEXT NOT NULL,          -- JSON [{"name", "score"}]
+    changed_at  REAL NOT NULL,
+    checked_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    grp         TEXT NOT NULL,
+    changed_at  REAL NOT NULL,
+    old_hash    TEXT,                   -- NULL for the first snapshot
+    new_hash    TEXT NOT NULL,
+    diff        TEXT NOT NULL           -- JSON, see diff_students()
+);
+CREATE INDEX IF NOT EXISTS changes_grp_time ON changes (grp, changed_at);
+"""
+
+
+@dataclass(frozen=True)
+class GroupState:
+    group: str
+    hash: str
+    students: List[Dict[str, Any]]
+    changed_at: float
+    checked_at: float
+
+
+@dataclass(frozen=True)
+class Change:
+    id: int
+    group: str
+    changed_at: float
+    old_hash: Optional[str]
+    new_hash: str
+    diff: Dict[str, Any]
+
+
+def diff_students(old: Sequence[Dict[str, Any]], new: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """``{"added": [...], "removed": [...], "scores": {name: [old, new]}}``."""
+    before = {s["name"]: s["score"] for s in old}
+    after = {s["name"]: s["score"] for s in new}
+    return {
+        "added": [n for n in after if n not in before],
+        "removed": [n for n in before if n not in after],
+        "scores": {n: [before[n], after[n]] for n in after if n in before and before[n] != after[n]},
+    }
+
+
+class ChangeStore:
+    """Latest sheet hash + parsed scores per group and the history of changes.
+
+    SQLite in WAL mode: readers never block the writer, and the bot and
+    Flask processes can share the file.  Every :meth:`record` is one
+    ``BEGIN IMMEDIATE`` transaction, so concurrent checks of the same group
+    cannot both log the same change.  Connections are per thread.
+    """
+
+    def __init__(self, path: str | Path = DB_PATH) -> None:
+        self.path = Path(path)
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    def record(
+        self,
+        group: str,
+        sheet_hash: str,
+        students: Sequence[Dict[str, Any]],
+        *,
+        at: float | None = None,
+    ) -> Optional[Change]:
+        """Store the check result; returns the new :class:`Change` or ``None``."""
+        at = time.time() if at is None else at
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT hash, students FROM snapshots WHERE grp = ?", (group,)
+            ).fetchone()
+            if row is not None and row[0] == sheet_hash:
+                conn.execute("UPDATE snapshots SET checked_at = ? WHERE grp = ?", (at, group))
+                conn.execute("COMMIT")
+                return None
+
+            old_hash = row[0] if row is not None else None
+            old_students = json.loads(row[1]) if row is not None else []
+            diff = diff_students(old_students, students)
+            cur = conn.execute(
+                "INSERT INTO changes (grp, changed_at, old_hash, new_hash, diff) VALUES (?, ?, ?, ?, ?)",
+                (group, at, old_hash, sheet_hash, json.dumps(diff, ensure_ascii=False)),
+            )
+            conn.execute(
+                "INSERT INTO snapshots (grp, hash, students, changed_at, checked_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(grp) DO UPDATE SET "
+                "hash = excluded.hash, students = excluded.students, "
+                "changed_at = excluded.changed_at, checked_at = excluded.checked_at",
+                (group, sheet_hash, json.dumps(list(students), ensure_ascii=False), at, at),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return Change(cur.lastrowid, group, at, old_hash, sheet_hash, diff)
+
+    def latest(self, group: str) -> Optional[GroupState]:
+        row = self._conn().execute(
+            "SELECT hash, students, changed_at, checked_at FROM snapshots WHERE grp = ?", (group,)
+        ).fetchone()
+        if row is None:
+            return None
+        return GroupState(group, row[0], json.loads(row[1]), row[2], row[3])
+
+    def changes_since(self, group: str, since: float = 0.0) -> List[Change]:
+        """Changes of *group* recorded after *since* (epoch s), oldest first."""
+        rows = self._conn().execute(
+            "SELECT id, changed_at, old_hash, new_hash, diff FROM changes "
+            "WHERE grp = ? AND changed_at > ? ORDER BY changed_at, id",
+            (group, since),
+        ).fetchall()
+        return [Change(r[0], group, r[1], r[2], r[3], json.loads(r[4])) for r in rows]
+
+    def import_legacy(self, state: Dict[str, Dict[str, Any]]) -> int:
+        """Seed hashes from the old JSON state file (only groups not yet known)."""
+        conn = self._conn()
+        imported = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for group, rec in state.items():
+                if not isinstance(rec, dict) or "hash" not in rec:
+                    continue
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO snapshots (grp, hash, students, changed_at, checked_at) "
+                    "VALUES (?, ?, '[]', 0, 0)",
+                    (group, rec["hash"]),
+                )
+                imported += cur.rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return imported
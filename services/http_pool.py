@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import http.client
+import threading
+import urllib.parse
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Tuple
+
+__all__ = ["HTTPResponse", "ConnectionPool", "pool"]
+
+MAX_IDLE_PER_HOST: int = 8
+MAX_REDIRECTS: int = 5
+
+_Key = Tuple[str, str, int]  # scheme, host, port
+
+
+@dataclass(frozen=True)
+class HTTPResponse:
+    url: str                  # final URL after redirects
+    status: int
+    headers: Dict[str, str]   # lower‑cased names
+    body: bytes
+
+
+class ConnectionPool:
+    """Thread‑safe keep‑alive ``http.client`` connections, pooled per host.
+
+    A request borrows an idle connection to the target host (or opens a new
+    one), reads the whole response and hands the connection back, so
+    concurrent callers to the same host reuse a handful of TCP/TLS sessions
+    instead of paying a handshake each time.  Redirects are followed
+    manually, keeping the request headers (conditional GET validators).
+    """
+
+    def __init__(self, max_idle_per_host: int = MAX_IDLE_PER_HOST) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self._idle: Dict[_Key, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def get(
+        self,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        *,
+        timeout: float = 15.0,
+    ) -> HTTPResponse:
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._request(url, dict(headers or {}), timeout)
+            location = resp.headers.get("location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return resp
+        raise http.client.HTTPException(f"too many redirects for {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    # ------------------------------------------------------------------
+    def _request(self, url: str, headers: Dict[str, str], timeout: float) -> HTTPResponse:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key: _Key = (scheme, parts.hostname or "", port)
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+
+        # A pooled connection may have been closed by the server meanwhile –
+        # retry exactly once on a fresh one in that case.
+        for attempt in (0, 1):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                conn.request("GET", path, headers=headers)
+                raw = conn.getresponse()
+                body = raw.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            resp = HTTPResponse(
+                url=url,
+                status=raw.status,
+                headers={k.lower(): v for k, v in raw.getheaders()},
+                body=body,
+            )
+            if raw.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return resp
+        raise AssertionError("unreachable")
+
+    def _acquire(self, key: _Key, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=timeout), False
+
+    def _release(self, key: _Key, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+
+# Process‑wide pool shared by every sheet request
+pool = ConnectionPool()
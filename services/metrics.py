@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import bisect
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from .atomic_file import try_atomic_write
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "REGISTRY",
+    "counter",
+    "gauge",
+    "histogram",
+    "load_shared",
+    "render_text",
+    "exposition",
+    "CONTENT_TYPE",
+]
+
+# ---------------------------------------------------------------------------
+# configuration
+# ---------------------------------------------------------------------------
+
+# Every process drops its snapshot here (shared volume with the sheet cache);
+# the Flask ``/metrics`` endpoint serves its own registry plus these files.
+METRICS_DIR: Path = Path(__file__).with_name("sheet_cache") / "metrics"
+METRICS_DUMP_SEC: float = float(os.getenv("MATSTAT_METRICS_DUMP_SEC", "15"))
+# Snapshots not rewritten for this long belong to a dead process – skipped
+METRICS_STALE_SEC: float = 10 * METRICS_DUMP_SEC
+
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; request‑ and fetch‑sized by default, renders pass their own
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# (name suffix, labels, value) – histograms expand into _bucket/_sum/_count
+Sample = Tuple[str, Dict[str, str], float]
+
+
+# ---------------------------------------------------------------------------
+# metric types
+# ---------------------------------------------------------------------------
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Mapping[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames) or any(n not in labels for n in self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count per label set (name it ``…_total``)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            return [("", self._labels(k), v) for k, v in self._values.items()]
+
+
+class Gauge(_Metric):
+    """Current value per label set, or a callback read at collection time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._fn: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Read the (unlabelled) value from *fn* whenever metrics are collected."""
+        if self.labelnames:
+            raise ValueError(f"{self.name}: callback gauges cannot have labels")
+        self._fn = fn
+
+    def samples(self) -> List[Sample]:
+        if self._fn is not None:
+            try:
+                return [("", {}, float(self._fn()))]
+            except Exception:
+                return []
+        with self._lock:
+            return [("", self._labels(k), v) for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key → [per‑bucket counts… (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            acc = self._values.get(key)
+            if acc is None:
+                acc = self._values[key] = [0.0] * (len(self.buckets) + 3)
+            acc[idx] += 1
+            acc[-2] += value
+            acc[-1] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def samples(self) -> List[Sample]:
+        out: List[Sample] = []
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for key, acc in items:
+            labels = self._labels(key)
+            running = 0.0
+            for bound, n in zip(self.buckets + (math.inf,), acc[:-2]):
+                running += n
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, running))
+            out.append(("_sum", labels, acc[-2]))
+            out.append(("_count", labels, acc[-1]))
+        return out
+
+
+# ---------------------------------------------------------------------------
+# registry – one per process, optionally dumped for other processes
+# ---------------------------------------------------------------------------
+
+class Registry:
+    """Named metrics of one process; ``counter``/``gauge``/``histogram`` are
+    get‑or‑create, so modules can declare their metrics at import time."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: type, name: str, *args: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets)
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """JSON‑able families: ``{"name", "type", "help", "samples"}``."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return [
+            {"name": m.name, "type": m.kind, "help": m.help, "samples": m.samples()}
+            for m in metrics
+        ]
+
+    # ------------------------------------------------------------------
+    def dump(self, path: str | Path) -> None:
+        """Write :meth:`collect` to *path* atomically (best‑effort)."""
+        data = {"written_at": time.time(), "pid": os.getpid(), "families": self.collect()}
+        try_atomic_write(path, json.dumps(data))
+
+    def start_dumping(
+        self,
+        process: str,
+        *,
+        directory: str | Path = METRICS_DIR,
+        interval: float = METRICS_DUMP_SEC,
+    ) -> threading.Thread:
+        """Dump to ``<directory>/<process>.json`` every *interval* seconds."""
+        path = Path(directory) / f"{process}.json"
+
+        def loop() -> None:
+            while True:
+                self.dump(path)
+                time.sleep(interval)
+
+        thread = threading.Thread(target=loop, name=f"metrics-{process}", daemon=True)
+        thread.start()
+        return thread
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+# ---------------------------------------------------------------------------
+# exposition – Prometheus text format
+# ---------------------------------------------------------------------------
+
+def load_shared(
+    directory: str | Path = METRICS_DIR,
+    *,
+    exclude: Iterable[str] = (),
+    max_age: float = METRICS_STALE_SEC,
+) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """``[(process, families)]`` of the fresh snapshots dumped by other processes."""
+    skip = set(exclude)
+    out: List[Tuple[str, List[Dict[str, Any]]]] = []
+    now = time.time()
+    try:
+        paths = sorted(Path(directory).glob("*.json"))
+    except OSError:
+        return out
+    for path in paths:
+        if path.stem in skip:
+            continue
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if now - float(data.get("written_at", 0.0)) > max_age:
+            continue
+        out.append((path.stem, data.get("families") or []))
+    return out
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_text(sources: Iterable[Tuple[str, List[Dict[str, Any]]]]) -> str:
+    """Merge ``(process, families)`` into one exposition; every sample gets a
+    ``process`` label, so equal metric names of different processes coexist."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for process, families in sources:
+        for fam in families:
+            slot = merged.setdefault(
+                fam["name"], {"type": fam["type"], "help": fam["help"], "lines": []}
+            )
+            for suffix, labels, value in fam["samples"]:
+                labels = {"process": process, **labels}
+                body = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                slot["lines"].append(f"{fam['name']}{suffix}{{{body}}} {_format_value(value)}")
+
+    lines: List[str] = []
+    for name, slot in merged.items():
+        lines.append(f"# HELP {name} {slot['help']}")
+        lines.append(f"# TYPE {name} {slot['type']}")
+        lines.extend(slot["lines"])
+    return "\n".join(lines) + "\n"
+
+
+def exposition(process: str) -> str:
+    """This process's registry (as *process*) plus every shared snapshot."""
+    return render_text(
+        [(process, REGISTRY.collect()), *load_shared(exclude=[process])]
+    )
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover – non‑POSIX: lease without file locking
+    fcntl = None  # type: ignore[assignment]
+
+__all__ = ["FileLease", "GroupSchedule", "PollScheduler", "poll_lease", "POLL_MAX_GAP_SEC"]
+
+# ---------------------------------------------------------------------------
+# configuration
+# ---------------------------------------------------------------------------
+
+# A group that just changed is polled again after POLL_MIN_SEC; every quiet
+# check multiplies its interval by POLL_BACKOFF up to POLL_MAX_SEC (which
+# bounds how late the first change after a quiet spell is noticed).
+POLL_MIN_SEC: float = float(os.getenv("MATSTAT_POLL_MIN_SEC", "120"))
+POLL_MAX_SEC: float = float(os.getenv("MATSTAT_POLL_MAX_SEC", "3600"))
+POLL_BACKOFF: float = 2.0
+POLL_JITTER: float = 0.1       # ± fraction of the interval
+# Longest a group goes unchecked while the lease holder is alive
+POLL_MAX_GAP_SEC: float = POLL_MAX_SEC * (1.0 + POLL_JITTER)
+LEASE_TTL_SEC: float = float(os.getenv("MATSTAT_POLL_LEASE_SEC", "300"))
+
+# Shared with the snapshot store's cache directory (a volume in docker)
+LEASE_PATH: Path = Path(__file__).with_name("sheet_cache") / "poll.lease"
+
+Clock = Callable[[], float]
+
+
+# ---------------------------------------------------------------------------
+# cross‑process lease – only the holder polls the spreadsheet
+# ---------------------------------------------------------------------------
+
+class FileLease:
+    """Time‑limited ownership recorded in a small JSON file.
+
+    ``acquire`` takes (or renews) the lease if it is free, expired or
+    already ours; the read‑modify‑write runs under ``flock`` so two
+    processes never both win.  A crashed holder simply lets it expire.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float = LEASE_TTL_SEC,
+        *,
+        owner: str | None = None,
+        clock: Clock = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.clock = clock
+
+    def acquire(self) -> bool:
+        try:
+            return self._update(take=True)
+        except OSError:
+            return True  # no shared directory → nobody to coordinate with
+
+    def release(self) -> None:
+        try:
+            self._update(take=False)
+        except OSError:
+            pass
+
+    def holder(self) -> Optional[str]:
+        """Owner of the unexpired lease, ``None`` if it is free."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if float(data.get("expires", 0.0)) <= self.clock():
+            return None
+        return data.get("owner")
+
+    def held_elsewhere(self) -> bool:
+        holder = self.holder()
+        return holder is not None and holder != self.owner
+
+    # ------------------------------------------------------------------
+    def _update(self, *, take: bool) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a+", encoding="utf-8") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            fh.seek(0)
+            try:
+                data = json.loads(fh.read() or "{}")
+            except ValueError:
+                data = {}
+            now = self.clock()
+            mine = data.get("owner") == self.owner
+            free = float(data.get("expires", 0.0)) <= now
+
+            if take and not (mine or free):
+                return False
+            if not take and not mine:
+                return False
+            data = {"owner": self.owner, "expires": now + self.ttl} if take else {}
+            fh.seek(0)
+            fh.truncate()
+            fh.write(json.dumps(data))
+            fh.flush()
+            return True
+
+
+# Process‑wide lease on the spreadsheet polling
+poll_lease = FileLease(LEASE_PATH)
+
+
+# ---------------------------------------------------------------------------
+# scheduler
+# ---------------------------------------------------------------------------
+
+@dataclass
+class GroupSchedule:
+    interval: float
+    next_due: float
+    last_change: Optional[float] = None
+    last_check: Optional[float] = None
+
+
+# check(groups) → {group: result with .changed (True/False, None on error)}
+CheckFn = Callable[[List[str]], Mapping[str, object]]
+
+
+class PollScheduler:
+    """Per‑group adaptive polling: fast after a change, exponential back‑off
+    while quiet, ± jitter so groups drift apart.
+
+    Time comes only from *clock* and randomness only from *rng*, so a fake
+    clock drives :meth:`step` deterministically.  :meth:`run_forever` is the
+    real loop; :meth:`check_now` makes groups due at once and wakes it.
+    While another process holds the lease, the loop only retries it every
+    *min_interval*.
+    """
+
+    def __init__(
+        self,
+        groups: Iterable[str],
+        check: CheckFn,
+        *,
+        min_interval: float = POLL_MIN_SEC,
+        max_interval: float = POLL_MAX_SEC,
+        backoff: float = POLL_BACKOFF,
+        jitter: float = POLL_JITTER,
+        clock: Clock = time.time,
+        rng: random.Random | None = None,
+        lease: FileLease | None = None,
+    ) -> None:
+        self.check = check
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        now = clock()
+        # Everything is due right away on start
+        self.schedule: Dict[str, GroupSchedule] = {
+            g: GroupSchedule(interval=min_interval, next_due=now) for g in groups
+        }
+
+    # ------------------------------------------------------------------
+    def check_now(self, groups: Iterable[str] | None = None, *, min_age: float = 0.0) -> None:
+        """Make *groups* (default: all) due now, except those checked less
+        than *min_age* seconds ago."""
+        now = self.clock()
+        woken = False
+        with self._lock:
+            for g in (self.schedule if groups is None else groups):
+                s = self.schedule[g]
+                if s.last_check is not None and now - s.last_check < min_age:
+                    continue
+                s.next_due = now
+                woken = True
+        if woken:
+            self._wake.set()
+
+    def due(self) -> List[str]:
+        now = self.clock()
+        with self._lock:
+            return [g for g, s in self.schedule.items() if s.next_due <= now]
+
+    def next_due(self) -> float:
+        with self._lock:
+            return min((s.next_due for s in self.schedule.values()), default=float("inf"))
+
+    def step(self) -> Optional[Mapping[str, object]]:
+        """Check the due groups (if the lease allows); ``None`` → lease held elsewhere."""
+        groups = self.due()
+        if not groups:
+            return {}
+        if self.lease is not None and not self.lease.acquire():
+            return None
+        results = self.check(groups)
+        now = self.clock()
+        with self._lock:
+            for g in groups:
+                self._reschedule(g, getattr(results.get(g), "changed", None), now)
+        return results
+
+    def run_forever(
+        self,
+        on_results: Callable[[Mapping[str, object]], None],
+        stop: threading.Event | None = None,
+    ) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                results = self.step()
+            except Exception as exc:
+                print(f"[poll] check failed: {exc}")
+                results = {}
+            if results:
+                on_results(results)
+
+            if results is None:
+                # Somebody else polls – try for the lease again a poll later
+                wait = self.min_interval
+            else:
+                wait = self.next_due() - self.clock()
+                if self.lease is not None:
+                    wait = min(wait, self.lease.ttl / 3.0)  # renew while holding
+            self._wake.wait(max(1.0, wait))
+            self._wake.clear()
+        if self.lease is not None:
+            self.lease.release()
+
+    # ------------------------------------------------------------------
+    def _reschedule(self, group: str, changed: Optional[bool], now: float) -> None:
+        s = self.schedule[group]
+        s.last_check = now
+        if changed:
+            s.interval = self.min_interval
+            s.last_change = now
+        elif changed is not None:
+            s.interval = min(s.interval * self.backoff, self.max_interval)
+        # changed is None (failed check): keep the interval, retry soon
+        base = self.min_interval if changed is None else s.interval
+        s.next_due = now + base * (1.0 + self.rng.uniform(-self.jitter, self.jitter))
+
+
+# ---------------------------------------------------------------------------
+# CLI – simulated day on a fake clock
+# ---------------------------------------------------------------------------
+
+def _simulate() -> None:
+    """Two groups over 24 h: one changes every 10 min during a 2 h lesson."""
+    now = [0.0]
+    lesson = (10 * 3600.0, 12 * 3600.0)
+    changes = {"busy": [lesson[0] + 600 * i for i in range(12)], "idle": []}
+    seen = {g: 0 for g in changes}
+    checks: Dict[str, List[float]] = {g: [] for g in changes}
+
+    @dataclass
+    class Result:
+        changed: bool
+
+    def check(groups: List[str]) -> Dict[str, Result]:
+        out = {}
+        for g in groups:
+            n = sum(t <= now[0] for t in changes[g])
+            out[g] = Result(changed=n > seen[g])
+            seen[g] = n
+            checks[g].append(now[0])
+        return out
+
+    sched = PollScheduler(changes, check, clock=lambda: now[0], rng=random.Random(0))
+    while now[0] < 24 * 3600:
+        sched.step()
+        now[0] = sched.next_due()
+
+    first = min(c for c in checks["busy"] if c >= lesson[0])
+    later = [min(c for c in checks["busy"] if c >= t) - t for t in changes["busy"] if t > first]
+    print(f"[poll] busy: {len(checks['busy'])} checks; first change of the day seen after "
+          f"{(first - lesson[0]) / 60:.1f} min, later ones after ≤ {max(later) / 60:.1f} min")
+    print(f"[poll] idle: {len(checks['idle'])} checks in 24 h "
+          f"(fixed {POLL_MIN_SEC / 60:.0f} min polling: {24 * 3600 / POLL_MIN_SEC:.0f})")
+    assert first - lesson[0] <= POLL_MAX_SEC * (1 + POLL_JITTER)
+    assert max(later) <= 4 * POLL_MIN_SEC * (1 + POLL_JITTER)
+    assert len(checks["idle"]) <= 24 * 3600 / POLL_MAX_SEC + 10
+
+    # check_now makes a backed‑off group due immediately …
+    sched.check_now(["idle"])
+    assert "idle" in sched.due()
+    # … unless it was checked less than min_age ago
+    sched.step()
+    sched.check_now(["idle"], min_age=POLL_MIN_SEC)
+    assert "idle" not in sched.due()
+
+    # Lease: a second owner is refused until the first one expires
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        a = FileLease(Path(tmp) / "l", ttl=10, owner="a", clock=lambda: now[0])
+        b = FileLease(Path(tmp) / "l", ttl=10, owner="b", clock=lambda: now[0])
+        assert a.acquire() and not b.acquire() and b.held_elsewhere()
+        now[0] += 11
+        assert b.acquire() and not a.acquire()
+    print("[poll] simulation passed")
+
+
+if __name__ == "__main__":
+    _simulate()
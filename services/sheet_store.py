@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .atomic_file import atomic_write
+from .http_pool import ConnectionPool, pool as _default_pool
+from .metrics import counter, histogram
+from .student_data import GROUPS, parse_students, sheet_csv_url
+
+__all__ = ["SheetFetchError", "SheetSnapshot", "SheetStore", "get_snapshot", "store"]
+
+# ---------------------------------------------------------------------------
+# configuration
+# ---------------------------------------------------------------------------
+
+# Raw bodies + metadata survive restarts so the first request can revalidate
+_CACHE_DIR: Path = Path(__file__).with_name("sheet_cache")
+
+# Snapshots younger than this are handed out without touching the network,
+# so back‑to‑back callers (change check → render) share one download.
+FRESH_SEC: float = 5.0
+HTTP_TIMEOUT_SEC: float = 15.0
+
+
+class SheetFetchError(OSError):
+    """The export endpoint answered with an unexpected HTTP status."""
+
+
+_FETCH_SECONDS = histogram(
+    "matstat_sheet_fetch_seconds", "Spreadsheet export request latency", ["group", "status"]
+)
+_FETCH_ERRORS = counter(
+    "matstat_sheet_fetch_errors_total", "Failed spreadsheet export requests", ["group", "reason"]
+)
+# hit: served without the network, not_modified: 304, changed / unchanged: 200
+_STORE_LOOKUPS = counter(
+    "matstat_sheet_store_lookups_total", "Sheet snapshot lookups by outcome", ["result"]
+)
+
+
+# ---------------------------------------------------------------------------
+# snapshot – one downloaded CSV body, hashed and parsed exactly once
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class SheetSnapshot:
+    group: str
+    body: bytes
+    md5: str                        # digest of *body* (change detection)
+    students: List[Dict[str, Any]]  # parse_students(body) – do not mutate
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float               # last time the server confirmed the body
+
+    @classmethod
+    def from_body(
+        cls,
+        group: str,
+        body: bytes,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> "SheetSnapshot":
+        return cls(
+            group=group,
+            body=body,
+            md5=hashlib.md5(body).hexdigest(),
+            students=parse_students(body),
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=time.time(),
+        )
+
+
+# ---------------------------------------------------------------------------
+# store – conditional GET + persistence
+# ---------------------------------------------------------------------------
+
+class SheetStore:
+    """Per‑group latest :class:`SheetSnapshot`, revalidated with conditional GET.
+
+    ``If-None-Match`` / ``If-Modified-Since`` are sent whenever a previous
+    snapshot (in memory or on disk) carries an ``ETag`` / ``Last-Modified``;
+    a ``304`` keeps the old body, hash and parsed rows.  A changed body is
+    hashed and parsed once and persisted as ``<group>.csv`` + ``<group>.json``.
+
+    Processes sharing *cache_dir* also share results: a persisted copy that
+    is newer than the in‑memory one is adopted before deciding whether to
+    go to the network.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = _CACHE_DIR,
+        *,
+        fresh_sec: float = FRESH_SEC,
+        http: ConnectionPool | None = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.fresh_sec = fresh_sec
+        self.http = http or _default_pool
+        self._snapshots: Dict[str, SheetSnapshot] = {}
+        self._locks: Dict[str, threading.Lock] = {g: threading.Lock() for g in GROUPS}
+        self._meta_mtime: Dict[str, int] = {}  # of <group>.json as last seen by us
+
+    # ------------------------------------------------------------------
+    def get(self, group: str, *, max_age: float | None = None) -> SheetSnapshot:
+        """Current snapshot of *group*; hits the network only if older than *max_age*."""
+        if group not in GROUPS:
+            raise KeyError(f"Unknown group '{group}'. Available: {list(GROUPS)}")
+        max_age = self.fresh_sec if max_age is None else max_age
+
+        with self._locks[group]:
+            current = self._adopt_shared(group, self._snapshots.get(group))
+            if current is not None and time.time() - current.fetched_at <= max_age:
+                self._snapshots[group] = current
+                _STORE_LOOKUPS.inc(result="hit")
+                return current
+
+            snap = self._revalidate(group, current)
+            self._snapshots[group] = snap
+            return snap
+
+    def peek(self, group: str) -> SheetSnapshot | None:
+        """Last known snapshot without any network access (may be ``None``)."""
+        return self._snapshots.get(group) or self._load(group)
+
+    # ------------------------------------------------------------------
+    def _revalidate(self, group: str, current: SheetSnapshot | None) -> SheetSnapshot:
+        headers: Dict[str, str] = {}
+        if current is not None:
+            if current.etag:
+                headers["If-None-Match"] = current.etag
+            if current.last_modified:
+                headers["If-Modified-Since"] = current.last_modified
+
+        t0 = time.perf_counter()
+        try:
+            resp = self.http.get(sheet_csv_url(group), headers, timeout=HTTP_TIMEOUT_SEC)
+        except Exception as exc:
+            _FETCH_SECONDS.observe(time.perf_counter() - t0, group=group, status="error")
+            _FETCH_ERRORS.inc(group=group, reason=type(exc).__name__)
+            raise
+        _FETCH_SECONDS.observe(time.perf_counter() - t0, group=group, status=resp.status)
+
+        if resp.status == 304 and current is not None:
+            snap = dataclasses.replace(current, fetched_at=time.time())
+            self._save(snap, body=False)
+            _STORE_LOOKUPS.inc(result="not_modified")
+            return snap
+        if resp.status != 200:
+            _FETCH_ERRORS.inc(group=group, reason=f"http_{resp.status}")
+            raise SheetFetchError(f"HTTP {resp.status} for {group} sheet ({resp.url})")
+        body = resp.body
+        etag = resp.headers.get("etag")
+        last_modified = resp.headers.get("last-modified")
+
+        if current is not None and hashlib.md5(body).hexdigest() == current.md5:
+            # Server ignored the validators but nothing changed – skip re‑parse
+            snap = dataclasses.replace(
+                current, etag=etag, last_modified=last_modified, fetched_at=time.time()
+            )
+            _STORE_LOOKUPS.inc(result="unchanged")
+        else:
+            snap = SheetSnapshot.from_body(group, body, etag=etag, last_modified=last_modified)
+            _STORE_LOOKUPS.inc(result="changed")
+        self._save(snap)
+        return snap
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+    def _paths(self, group: str) -> tuple[Path, Path]:
+        assert self.cache_dir is not None
+        return self.cache_dir / f"{group}.csv", self.cache_dir / f"{group}.json"
+
+    def _adopt_shared(self, group: str, current: SheetSnapshot | None) -> SheetSnapshot | None:
+        """*current*, or the persisted copy if another process refreshed it since."""
+        if self.cache_dir is None:
+            return current
+        try:
+            mtime = self._paths(group)[1].stat().st_mtime_ns
+        except OSError:
+            return current
+        if current is not None and mtime == self._meta_mtime.get(group):
+            return current  # nothing written since we last read / wrote it
+        shared = self._load(group)
+        self._meta_mtime[group] = mtime
+        if shared is None or (current is not None and shared.fetched_at <= current.fetched_at):
+            return current
+        return shared
+
+    def _load(self, group: str) -> SheetSnapshot | None:
+        if self.cache_dir is None:
+            return None
+        body_path, meta_path = self._paths(group)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if hashlib.md5(body).hexdigest() != meta.get("md5"):
+            return None  # torn write – ignore and refetch
+        return SheetSnapshot(
+            group=group,
+            body=body,
+            md5=meta["md5"],
+            students=meta.get("students") or parse_students(body),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            fetched_at=float(meta.get("fetched_at", 0.0)),
+        )
+
+    def _save(self, snap: SheetSnapshot, *, body: bool = True) -> None:
+        if self.cache_dir is None:
+            return
+        body_path, meta_path = self._paths(snap.group)
+        meta = {
+            "md5": snap.md5,
+            "etag": snap.etag,
+            "last_modified": snap.last_modified,
+            "fetched_at": snap.fetched_at,
+            "students": snap.students,
+        }
+        try:
+            if body:
+                atomic_write(body_path, snap.body)
+            atomic_write(meta_path, json.dumps(meta, ensure_ascii=False))
+            self._meta_mtime[snap.group] = meta_path.stat().st_mtime_ns
+        except OSError:
+            pass  # unwritable cache dir → memory only
+
+
+# ---------------------------------------------------------------------------
+# public API – process‑wide store
+# ---------------------------------------------------------------------------
+
+store = SheetStore()
+
+
+def get_snapshot(group: str, *, max_age: float | None = None) -> SheetSnapshot:
+    """Shortcut for ``store.get`` on the process‑wide store."""
+    return store.get(group, max_age=max_age)
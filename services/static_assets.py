@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .atomic_file import atomic_write
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover – .br variants are skipped without it
+    brotli = None  # type: ignore[assignment]
+
+__all__ = ["build", "AssetManifest", "manifest", "init_app"]
+
+# ---------------------------------------------------------------------------
+# configuration
+# ---------------------------------------------------------------------------
+
+_ROOT: Path = Path(__file__).resolve().parents[1]
+SOURCE_DIR: Path = _ROOT / "static"
+# Build output; a volume nginx serves /static from (see nginx.conf)
+DIST_DIR: Path = Path(os.getenv("MATSTAT_STATIC_DIST", str(_ROOT / "static_dist")))
+MANIFEST: str = "manifest.json"
+
+HASH_LEN: int = 12
+# Text formats worth pre‑compressing (images are compressed already)
+COMPRESSIBLE: frozenset[str] = frozenset({".css", ".js", ".svg", ".json", ".html", ".txt"})
+# .br only where nginx (no brotli module) maps the variant back to a type
+BROTLI_TYPES: frozenset[str] = frozenset({".css", ".js"})
+# Served with ``immutable`` by nginx – the name changes with the content
+HASHED_MAX_AGE: int = 365 * 24 * 3600
+
+_CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+# ---------------------------------------------------------------------------
+# build – content‑hashed copies + .gz / .br variants + manifest
+# ---------------------------------------------------------------------------
+
+def _hashed_name(rel: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LEN]
+    path = Path(rel)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix())
+
+
+def _rewrite_css(rel: str, data: bytes, assets: Dict[str, str]) -> bytes:
+    """Point relative ``url(...)`` references at the hashed names."""
+    base = Path(rel).parent
+
+    def sub(m: re.Match) -> str:
+        quote, target = m.group(1), m.group(2)
+        if re.match(r"^([a-z]+:|/|#)", target):
+            return m.group(0)  # absolute, data: or fragment – leave alone
+        ref = os.path.normpath((base / target).as_posix()).replace(os.sep, "/")
+        hashed = assets.get(ref)
+        if hashed is None:
+            return m.group(0)
+        new = os.path.relpath(hashed, base.as_posix() or ".").replace(os.sep, "/")
+        return f"url({quote}{new}{quote})"
+
+    return _CSS_URL.sub(sub, data.decode("utf-8")).encode("utf-8")
+
+
+def _emit(dest: Path, data: bytes) -> None:
+    """Write *dest* plus its pre‑compressed variants (only when smaller)."""
+    atomic_write(dest, data)
+    if dest.suffix not in COMPRESSIBLE:
+        return
+    variants = [(".gz", gzip.compress(data, 9, mtime=0))]
+    if brotli is not None and dest.suffix in BROTLI_TYPES:
+        variants.append((".br", brotli.compress(data, quality=11)))
+    for ext, packed in variants:
+        variant = dest.with_name(dest.name + ext)
+        if len(packed) < len(data):
+            atomic_write(variant, packed)
+        else:
+            try:
+                variant.unlink()  # a stale one would shadow the new file
+            except OSError:
+                pass
+
+
+def build(source: Path = SOURCE_DIR, dist: Path = DIST_DIR) -> Dict[str, str]:
+    """Build *dist* from *source*; returns ``{source path: hashed path}``.
+
+    Every file is written twice – under its content‑hashed name (cached
+    forever) and under its plain name (fallback for ES module imports when
+    the import map is unsupported).  CSS is processed last so its
+    ``url()`` references can point at hashed images.  Hashed files of the
+    previous build are kept, so pages rendered just before a deploy still
+    load; older ones are removed.
+    """
+    files = sorted(
+        p for p in source.rglob("*")
+        if p.is_file() and not any(part.startswith(".") for part in p.relative_to(source).parts)
+    )
+    files.sort(key=lambda p: p.suffix == ".css")
+
+    assets: Dict[str, str] = {}
+    for path in files:
+        rel = path.relative_to(source).as_posix()
+        data = path.read_bytes()
+        if path.suffix == ".css":
+            data = _rewrite_css(rel, data, assets)
+        hashed = _hashed_name(rel, data)
+        _emit(dist / hashed, data)
+        _emit(dist / rel, data)
+        assets[rel] = hashed
+
+    previous = _read_manifest(dist / MANIFEST) or {}
+    keep = set(assets.values()) | set((previous.get("assets") or {}).values())
+    _prune(dist, keep)
+
+    atomic_write(
+        dist / MANIFEST,
+        json.dumps({"assets": assets, "brotli": brotli is not None}, indent=1).encode("utf-8"),
+    )
+    return assets
+
+
+def _prune(dist: Path, keep: set) -> None:
+    hashed = re.compile(rf"\.[0-9a-f]{{{HASH_LEN}}}\.[^.]+(\.gz|\.br)?$")
+    for path in dist.rglob("*"):
+        if not path.is_file() or not hashed.search(path.name):
+            continue
+        rel = path.relative_to(dist).as_posix()
+        if re.sub(r"\.(gz|br)$", "", rel) not in keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# runtime – hashed URLs for url_for('static', ...)
+# ---------------------------------------------------------------------------
+
+class AssetManifest:
+    """``manifest.json`` of *dist*, reloaded whenever a build replaces it."""
+
+    def __init__(self, dist: Path = DIST_DIR) -> None:
+        self.path = dist / MANIFEST
+        self._assets: Dict[str, str] = {}
+        self._version = ""
+        self._mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def assets(self) -> Dict[str, str]:
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            return {}  # not built – plain names from static/
+        with self._lock:
+            if mtime != self._mtime:
+                data = _read_manifest(self.path) or {}
+                self._assets = dict(data.get("assets") or {})
+                digest = hashlib.sha256(json.dumps(self._assets, sort_keys=True).encode("utf-8"))
+                self._version = digest.hexdigest()[:HASH_LEN]
+                self._mtime = mtime
+            return self._assets
+
+    @property
+    def version(self) -> str:
+        """Digest of the current asset names (``""`` when not built)."""
+        return self._version if self.assets() else ""
+
+    def resolve(self, filename: str) -> str:
+        return self.assets().get(filename, filename)
+
+
+_manifest = AssetManifest()
+
+
+def manifest() -> AssetManifest:
+    return _manifest
+
+
+def init_app(app: Any) -> None:
+    """Hashed ``url_for('static', …)`` names, the JS import map, and a
+    static view that reads *dist* first (for runs without nginx)."""
+    from flask import abort, send_from_directory, url_for
+    from markupsafe import Markup
+    from werkzeug.exceptions import NotFound
+
+    @app.url_defaults
+    def _hashed_static(endpoint: str, values: Dict[str, Any]) -> None:
+        if endpoint == "static" and "filename" in values:
+            values["filename"] = _manifest.resolve(values["filename"])
+
+    def static_importmap() -> Markup:
+        """``<script type="importmap">`` sending plain module URLs to hashed ones.
+
+        ES modules import each other by relative plain names
+        (``./table.js``); the map redirects those to the hashed files, so
+        modules need no rewriting (their import graph has a cycle).
+        """
+        assets = _manifest.assets()
+        imports = {
+            f"{app.static_url_path}/{rel}": url_for("static", filename=rel)
+            for rel in assets
+            if rel.endswith(".js")
+        }
+        if not imports:
+            return Markup("")
+        body = json.dumps({"imports": imports}, indent=1).replace("</", "<\\/")
+        return Markup(f'<script type="importmap">{body}</script>')
+
+    app.jinja_env.globals["static_importmap"] = static_importmap
+
+    def send_static(filename: str):
+        hashed = filename in _manifest.assets().values()
+        for folder in (DIST_DIR, SOURCE_DIR):
+            try:
+                resp = send_from_directory(
+                    folder, filename, max_age=HASHED_MAX_AGE if hashed else None
+                )
+            except NotFound:
+                continue
+            resp.cache_control.immutable = hashed
+            return resp
+        abort(404)
+
+    app.view_functions["static"] = send_static
+
+
+if __name__ == "__main__":
+    built = build()
+    print(f"[static] {len(built)} assets → {DIST_DIR}" + ("" if brotli else " (no brotli module: .gz only)"))
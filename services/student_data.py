@@ -1,8 +1,17 @@
 from __future__ import annotations
 
-from typing import List, Dict
+import csv
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable, List, Dict
 
-import pandas as pd
+from .metrics import counter
+
+if TYPE_CHECKING:  # pragma: no cover – import only for annotations
+    from .sheet_store import SheetSnapshot
 
 # ---------------------------------------------------------------------------
 # Spreadsheet metadata
@@ -10,6 +19,12 @@ import pandas as pd
 
 SHEET_ID: str = "1QyIvnpMN1H3v6Ywj6QGl59KsdRbeUrtHXcAlE45sasY"
 
+# CSV export URL; override (e.g. with a local stub server) via the environment
+SHEET_URL_TEMPLATE: str = os.getenv(
+    "MATSTAT_SHEET_URL_TEMPLATE",
+    "https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}",
+)
+
 # Public *gid* of each subgroup worksheet inside the master sheet
 GROUPS: dict[str, str] = {
     "ft-201-1": "0",
@@ -47,6 +62,13 @@ EXCLUDED: set[str] = {
 # Zero‑based column indices that hold practice work scores
 PRACTICE_COLUMNS: list[int] = [9, 11, 13, 15, 17, 20, 22, 24, 26, 29, 31, 33, 35]
 
+# Cell values a spreadsheet export uses for "no value" (pandas' default NA set)
+_NA_VALUES: frozenset[str] = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+})
+
 
 def _parse_numeric(val) -> float:
     try:
@@ -56,29 +78,34 @@ def _parse_numeric(val) -> float:
         return 0.0
 
 
-def fetch_students(group: str) -> List[Dict[str, float]]:
+def sheet_csv_url(group: str) -> str:
+    """CSV export URL of *group*'s worksheet."""
     if group not in GROUPS:
         raise KeyError(f"Unknown group '{group}'. Available: {list(GROUPS)}")
+    return SHEET_URL_TEMPLATE.format(sheet_id=SHEET_ID, gid=GROUPS[group])
 
-    gid = GROUPS[group]
-    url = (
-        f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/"
-        f"export?format=csv&gid={gid}"
-    )
-    df = pd.read_csv(url)
 
-    students: list[dict[str, float]] = []
+def parse_students(body: bytes) -> List[Dict[str, float]]:
+    """Turn a raw CSV export into the ``[{"name", "score"}]`` list.
+
+    Single streaming pass with the ``csv`` module: only column 0 and
+    ``PRACTICE_COLUMNS`` are looked at, and reading stops at the first
+    empty name.
+    """
+    reader = csv.reader(io.StringIO(body.decode("utf-8-sig")))
+    next(reader, None)  # header row
 
-    # Start at row 1 to skip headers; continue until we hit the first empty name
-    for idx in range(len(df)):
-        name = str(df.iloc[idx, 0]).strip()
-        if name is None or "nan" in name:
+    students: list[dict[str, float]] = []
+    for row in reader:
+        if not row:
+            continue  # blank line (skipped by the export reader as well)
+        name = row[0].strip()
+        if row[0] in _NA_VALUES or "nan" in name:
             break  # End of the student list
         if name in EXCLUDED:
             continue
 
-        row = df.iloc[idx]
-        score = sum(_parse_numeric(row.iloc[col]) for col in PRACTICE_COLUMNS)
+        score = sum(_parse_numeric(row[col]) for col in PRACTICE_COLUMNS if col < len(row))
 
         if score == 0:
             score += 0.25   # чтобы сегмент этого студента не занимал все колесо
@@ -88,4 +115,143 @@ def fetch_students(group: str) -> List[Dict[str, float]]:
     return students
 
 
-__all__ = ["GROUPS", "EXCLUDED", "fetch_students"]
+def fetch_students(group: str) -> List[Dict[str, float]]:
+    if group not in GROUPS:
+        raise KeyError(f"Unknown group '{group}'. Available: {list(GROUPS)}")
+
+    # Shared snapshot store: conditional GET, body downloaded/parsed once
+    from .sheet_store import get_snapshot
+
+    return [dict(s) for s in get_snapshot(group).students]
+
+
+# ---------------------------------------------------------------------------
+# In‑process stale‑while‑revalidate cache (page views)
+# ---------------------------------------------------------------------------
+
+CACHE_TTL_SEC: float = float(os.getenv("MATSTAT_CACHE_TTL_SEC", "60"))
+# How long past the TTL a stale list may still be served while refreshing
+CACHE_STALE_SEC: float = float(os.getenv("MATSTAT_CACHE_STALE_SEC", "3600"))
+
+_cache: Dict[str, "SheetSnapshot"] = {}
+_inflight: Dict[str, Future] = {}         # group → running refresh
+_cache_lock = threading.Lock()
+
+# fresh / stale (served, refreshed in background) / miss / stale_if_error
+_CACHE_LOOKUPS = counter(
+    "matstat_student_cache_lookups_total", "Page‑view student cache lookups by outcome", ["result"]
+)
+
+
+def _refresh(group: str) -> Future:
+    """Start (or join) the single in‑flight refresh of *group*."""
+    with _cache_lock:
+        fut = _inflight.get(group)
+        if fut is not None:
+            return fut
+        fut = Future()
+        _inflight[group] = fut
+
+    from .poll_scheduler import POLL_MAX_GAP_SEC, poll_lease
+    from .sheet_store import get_snapshot
+
+    # While another process (the bot) holds the polling lease it keeps the
+    # shared sheet cache fresh – read its copy instead of asking Google too.
+    # A quiet group's copy may be as old as the holder's longest interval
+    # (plus a TTL of slack for the check itself).
+    max_age = POLL_MAX_GAP_SEC + CACHE_TTL_SEC if poll_lease.held_elsewhere() else 0.0
+    try:
+        snap = get_snapshot(group, max_age=max_age)
+    except BaseException as exc:
+        fut.set_exception(exc)
+    else:
+        with _cache_lock:
+            _cache[group] = snap
+        fut.set_result(snap)
+    finally:
+        with _cache_lock:
+            _inflight.pop(group, None)
+    return fut
+
+
+def _refresh_in_background(group: str) -> None:
+    with _cache_lock:
+        if group in _inflight:
+            return
+
+    def run() -> None:
+        try:
+            _refresh(group).result()
+        except Exception as exc:
+            print(f"[student_data] background refresh of {group} failed: {exc}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_students(group: str) -> List[Dict[str, float]]:
+    """Cached :func:`fetch_students` for request handlers.
+
+    * younger than ``CACHE_TTL_SEC`` → served from memory;
+    * stale but within ``CACHE_STALE_SEC`` → served from memory while one
+      background refresh revalidates it;
+    * missing / too old → fetched synchronously, concurrent misses for the
+      same group share a single request.  If that fetch fails, a stale list
+      (of any age) is served rather than an error.
+    """
+    return [dict(s) for s in get_snapshot_cached(group).students]
+
+
+def get_snapshot_cached(group: str) -> SheetSnapshot:
+    """Like :func:`get_students` but returns the whole sheet snapshot."""
+    if group not in GROUPS:
+        raise KeyError(f"Unknown group '{group}'. Available: {list(GROUPS)}")
+
+    with _cache_lock:
+        snap = _cache.get(group)
+    age = time.time() - snap.fetched_at if snap is not None else float("inf")
+
+    if age <= CACHE_TTL_SEC:
+        _CACHE_LOOKUPS.inc(result="fresh")
+        return snap
+    if age <= CACHE_TTL_SEC + CACHE_STALE_SEC:
+        _CACHE_LOOKUPS.inc(result="stale")
+        _refresh_in_background(group)
+        return snap
+
+    try:
+        snap = _refresh(group).result()
+    except Exception:
+        if snap is not None:
+            _CACHE_LOOKUPS.inc(result="stale_if_error")
+            return snap  # stale‑if‑error
+        raise
+    _CACHE_LOOKUPS.inc(result="miss")
+    return snap
+
+
+def warm_up(groups: Iterable[str] | None = None, *, background: bool = True) -> None:
+    """Prefetch *groups* (default: all) concurrently, optionally off‑thread."""
+    groups = list(GROUPS if groups is None else groups)
+
+    def run() -> None:
+        with ThreadPoolExecutor(max_workers=min(8, len(groups) or 1)) as pool:
+            for group, exc in zip(groups, pool.map(lambda g: _refresh(g).exception(), groups)):
+                if exc is not None:
+                    print(f"[student_data] warm‑up of {group} failed: {exc}")
+
+    if background:
+        threading.Thread(target=run, daemon=True).start()
+    else:
+        run()
+
+
+__all__ = [
+    "GROUPS",
+    "EXCLUDED",
+    "sheet_csv_url",
+    "parse_students",
+    "fetch_students",
+    "get_students",
+    "get_snapshot_cached",
+    "warm_up",
+]
@@ -2,103 +2,135 @@ from __future__ import annotations
 
 from pathlib import Path
 import json
-import hashlib
-import datetime as _dt
-import urllib.request
-from typing import Dict, Any
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, List, Optional
 
 try:
     # When the project is installed as a package
-    from .student_data import GROUPS, SHEET_ID  # type: ignore
+    from .student_data import GROUPS  # type: ignore
+    from .sheet_store import get_snapshot  # type: ignore
+    from .change_store import Change, ChangeStore  # type: ignore
 except ImportError:  # pragma: no cover – fallback for standalone runs
-    from .student_data import GROUPS, SHEET_ID  # type: ignore
+    from .student_data import GROUPS  # type: ignore
+    from .sheet_store import get_snapshot  # type: ignore
+    from .change_store import Change, ChangeStore  # type: ignore
 
-__all__ = ["has_table_changed"]
-
-# ---------------------------------------------------------------------------
-# persistent state file
-# ---------------------------------------------------------------------------
-
-_STATE_FILE: Path = Path(__file__).with_name(Path(__file__).stem + "_state.json")
-
-# Ensure the file *exists* so other tools/scripts do not stumble over a missing
-# path.  An empty file will simply be treated as "no state yet" by _load_state.
-try:
-    _STATE_FILE.touch(exist_ok=True)
-except OSError:
-    # Directory unwritable – we will operate in memory only (harmless but state
-    # will not survive restarts).
-    pass
+__all__ = ["GroupCheck", "has_table_changed", "check_all_groups", "changes_since"]
 
+# Upper bound on parallel sheet requests of one ``check_all_groups`` call
+MAX_PARALLEL_CHECKS: int = 8
 
 # ---------------------------------------------------------------------------
-# helpers – state I/O
+# persistent state – SQLite (WAL) shared by every process
 # ---------------------------------------------------------------------------
 
-def _load_state() -> Dict[str, Any]:
-    """Return the stored state or an empty dict if the file is empty/corrupt."""
-    try:
-        raw = _STATE_FILE.read_text(encoding="utf-8")
-    except OSError:
-        return {}
+# Pre‑SQLite state file; imported once into the store, then left alone
+_LEGACY_STATE_FILE: Path = Path(__file__).with_name(Path(__file__).stem + "_state.json")
 
-    if not raw.strip():  # brand‑new empty file
-        return {}
+_store_lock = threading.Lock()
+_store: Optional[ChangeStore] = None
 
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
-        return {}
 
-
-def _save_state(state: Dict[str, Any]) -> None:
-    """Atomically write *state* back to disk (best‑effort)."""
-    try:
-        _STATE_FILE.write_text(
-            json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-    except OSError:
-        # Non‑fatal – we will recompute next run; just log if needed.
-        pass
+def _change_store() -> ChangeStore:
+    """Process‑wide :class:`ChangeStore`, seeded from the legacy JSON on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = ChangeStore()
+            try:
+                legacy = json.loads(_LEGACY_STATE_FILE.read_text(encoding="utf-8") or "{}")
+            except (OSError, ValueError):
+                legacy = {}
+            if legacy:
+                store.import_legacy(legacy)
+            _store = store
+        return _store
 
 
 # ---------------------------------------------------------------------------
-# helpers – sheet downloading & hashing
+# helpers – sheet hashing
 # ---------------------------------------------------------------------------
 
-def _csv_url(group: str) -> str:
-    gid = GROUPS[group]
-    return (
-        f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={gid}"
-    )
-
+def _sheet_state(group: str) -> tuple[str, List[Dict[str, Any]]]:
+    """Return the MD5 digest and parsed rows of the current CSV export for *group*.
 
-def _sheet_hash(group: str) -> str:
-    """Return the MD5 digest of the current CSV export for *group*."""
-    with urllib.request.urlopen(_csv_url(group), timeout=15) as resp:
-        content = resp.read()
-    return hashlib.md5(content).hexdigest()
+    Goes through the shared snapshot store: a conditional GET that is
+    answered with ``304`` reuses the stored body, and a changed body is
+    parsed right away so the following ``fetch_students`` needs no download.
+    """
+    snap = get_snapshot(group, max_age=0)
+    return snap.md5, snap.students
 
 
 # ---------------------------------------------------------------------------
 # public API
 # ---------------------------------------------------------------------------
 
+@dataclass(frozen=True)
+class GroupCheck:
+    """Outcome of one group's change check."""
+
+    changed: Optional[bool]   # None → the check itself failed
+    seconds: float            # wall time of the sheet request
+    error: Optional[str] = None
+
+
 def has_table_changed(group: str) -> bool:  # noqa: D401
     """Return **True** iff the spreadsheet for *group* changed since last check."""
     if group not in GROUPS:
         raise KeyError(f"Unknown group '{group}'. Available: {list(GROUPS)}")
 
-    state = _load_state()
-    current_hash = _sheet_hash(group)
-
-    record = state.get(group)
-    changed = record is None or record.get("hash") != current_hash
-
-    if changed:
-        state[group] = {
-            "hash": current_hash,
-            "timestamp": _dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
-        }
-        _save_state(state)
-    return changed
+    current_hash, students = _sheet_state(group)
+    return _change_store().record(group, current_hash, students) is not None
+
+
+def check_all_groups(
+    groups: Iterable[str] | None = None,
+    *,
+    max_workers: int = MAX_PARALLEL_CHECKS,
+) -> Dict[str, GroupCheck]:
+    """Check every group concurrently; return per‑group results and timings.
+
+    Sheet requests fan out over a bounded thread pool and share the
+    keep‑alive connection pool of the snapshot store, so one slow group no
+    longer delays the others.  Each result is one short SQLite transaction.
+    """
+    groups = list(GROUPS if groups is None else groups)
+    for group in groups:
+        if group not in GROUPS:
+            raise KeyError(f"Unknown group '{group}'. Available: {list(GROUPS)}")
+
+    def timed_state(group: str):
+        t0 = time.perf_counter()
+        try:
+            return _sheet_state(group), time.perf_counter() - t0, None
+        except Exception as exc:  # reported per group, never aborts the batch
+            return None, time.perf_counter() - t0, f"{type(exc).__name__}: {exc}"
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups) or 1))) as pool:
+        states = dict(zip(groups, pool.map(timed_state, groups)))
+
+    store = _change_store()
+    results: Dict[str, GroupCheck] = {}
+    for group, (state, seconds, error) in states.items():
+        if state is None:
+            results[group] = GroupCheck(changed=None, seconds=seconds, error=error)
+            continue
+        try:
+            change = store.record(group, *state)
+        except sqlite3.Error as exc:
+            results[group] = GroupCheck(changed=None, seconds=seconds, error=f"state store: {exc}")
+            continue
+        results[group] = GroupCheck(changed=change is not None, seconds=seconds)
+    return results
+
+
+def changes_since(group: str, since: float = 0.0) -> List[Change]:
+    """Recorded changes of *group* after *since* (epoch seconds), oldest first."""
+    if group not in GROUPS:
+        raise KeyError(f"Unknown group '{group}'. Available: {list(GROUPS)}")
+    return _change_store().changes_since(group, since)
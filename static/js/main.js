@@ -5,16 +5,44 @@ import { populateTable, getExcludedStudents } from "./table.js";
 
 let wheel;
 
+// Data is re-checked this often; the endpoint answers 304 while nothing changed
+const REFRESH_MS = 60000;
+let currentVersion = studentsVersion;
+
 // Закрепляем цвета за студентами при первой загрузке
-students.forEach((student, idx) => {
-  student.color = `hsl(${(idx * 360) / students.length}, 70%, 60%)`;
-});
+function assignColors() {
+  students.forEach((student, idx) => {
+    student.color = `hsl(${(idx * 360) / students.length}, 70%, 60%)`;
+  });
+}
+assignColors();
 
 document.addEventListener("DOMContentLoaded", function () {
   updateWheel();
   document.getElementById("spinButton").addEventListener("click", () => startSpin(wheel));
+  setInterval(refreshStudents, REFRESH_MS);
 });
 
+// Подтягиваем свежие баллы без перезагрузки страницы
+async function refreshStudents() {
+  // Never swap the wheel mid-spin; hidden tabs catch up once visible again
+  if (document.hidden || document.getElementById("spinButton").disabled) return;
+  try {
+    // "no-cache" → the browser revalidates with If-None-Match
+    const response = await fetch(`/api/students/${encodeURIComponent(groupName)}`, { cache: "no-cache" });
+    if (!response.ok) return;
+    const data = await response.json();
+    if (data.version === currentVersion) return;
+
+    currentVersion = data.version;
+    students.splice(0, students.length, ...data.students);
+    assignColors();
+    updateWheel();
+  } catch (error) {
+    console.error("Failed to refresh students:", error);
+  }
+}
+
 // Функция обновления колеса при изменении списка студентов
 export function updateWheel() {
   const excludedStudents = getExcludedStudents();
@@ -2,13 +2,34 @@
     const container = document.getElementById('popup-container');
     const button = document.getElementById('popup-btn');
 
+    // Upcoming messages of this session's shuffle-bag, fetched in batches
+    const BATCH_SIZE = 5;
+    const REFILL_BELOW = 2;
+    const queue = [];
+    let pending = null;
+
     button.addEventListener('click', showRandomPopup);
+    refill().catch(error => console.error('Failed to prefetch messages:', error));
+
+    function refill() {
+        if (!pending) {
+            pending = fetch(`/next-messages?n=${BATCH_SIZE}`)
+                .then(response => response.json())
+                .then(data => { queue.push(...data.messages); })
+                .finally(() => { pending = null; });
+        }
+        return pending;
+    }
 
     async function showRandomPopup() {
         try {
-            const response = await fetch('/next-message'); // or full URL for local testing
-            const data = await response.json();
-            createPopup(data.message);
+            if (!queue.length) {
+                await refill();
+            }
+            createPopup(queue.shift());
+            if (queue.length < REFILL_BELOW) {
+                refill().catch(error => console.error('Failed to prefetch messages:', error));
+            }
         } catch (error) {
             console.error('Failed to fetch message:', error);
         }
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
-from collections import defaultdict
 import os
 import pathlib
 import random
 import threading
 import time
-from typing import Dict, Set
+from typing import Dict, List, Tuple
 
 import telebot
 from telebot import types
+from telebot.apihelper import ApiTelegramException
 
+from services.metrics import REGISTRY, counter, gauge, histogram
 from services.student_data import GROUPS  # mapping: group → gid
-from services.table_change_tracker import has_table_changed
+from services.poll_scheduler import PollScheduler, poll_lease
+from services.table_change_tracker import check_all_groups
+from wheel_video_render.wheel_manifest import ManifestCache
 from wheel_video_render.wheel_video_render import generate_group_videos
-from wheel_video_render.wheel_helpers import fetch_students
+from wheel_video_render.wheel_snapshot import take_snapshot
+
+from .file_id_cache import FileIdCache
+from .render_queue import PRIORITY_USER, PRIORITY_WATCHDOG, RenderJob, RenderQueue
+from .reveal_scheduler import RevealScheduler
 
 # ---------------------------------------------------------------------------
 # Configuration & globals
@@ -22,62 +29,166 @@ from wheel_video_render.wheel_helpers import fetch_students
 BOT_TOKEN: str = os.getenv("MATSTAT_LUCKY_WHEEL_BOT_TOKEN", "".join(
     ["777", "551", "5350:A", "AGL_P", "3-NY2ZC", "UmrEVnv6I", "x-LVZ7hVVo7uc"]
 ))
-CHECK_INTERVAL_HOURS: int = 5
-CHECK_INTERVAL_SEC: int = CHECK_INTERVAL_HOURS * 3600
+# Parallel render processes per group (x264 threads are split between them)
+RENDER_JOBS: int = int(os.getenv("MATSTAT_RENDER_JOBS", "1"))
+# Groups rendered at the same time (each with RENDER_JOBS processes)
+RENDER_WORKERS: int = int(os.getenv("MATSTAT_RENDER_WORKERS", "1"))
+# Minimum pause between two progress edits of one status message
+PROGRESS_EDIT_SEC: float = 3.0
+# >0 → render a student‑agnostic pool of that many spins instead of one per student
+SPIN_POOL_SIZE: int = int(os.getenv("MATSTAT_SPIN_POOL_SIZE", "0"))
+# Pause between the wheel video and the winner's name
+REVEAL_DELAY_SEC: float = float(os.getenv("MATSTAT_REVEAL_DELAY_SEC", "15"))
+# Chat that freshly rendered videos are uploaded to ahead of time (empty → off)
+PREUPLOAD_CHAT_ID: str = os.getenv("MATSTAT_PREUPLOAD_CHAT_ID", "")
+VIDEO_NOTE_LENGTH: int = 360
+# Render wall time buckets (s) – a batch takes minutes, not milliseconds
+RENDER_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
 
 bot = telebot.TeleBot(BOT_TOKEN, parse_mode="HTML")
 
-# Track groups under generation → avoid duplicate jobs
-_rendering: Set[str] = set()
-_rendering_lock = threading.Lock()
+# Delayed winner reveals – handlers return at once instead of sleeping.
+# Created on first use, so importing this module starts no threads.
+_reveals: RevealScheduler | None = None
+_reveals_lock = threading.Lock()
+
+# Telegram file_id of every uploaded video → resends cost no upload
+_file_ids = FileIdCache(pathlib.Path("videos") / ".file_ids.json")
+_preupload_lock = threading.Lock()
+
+# Parsed videos/<group>/current/manifest.json + alias table, reloaded on change
+_manifests = ManifestCache(pathlib.Path("videos"))
+
+# Chats waiting for a group's first render: group → [(chat_id, status msg id, pressed at)]
+_waiting: Dict[str, List[Tuple[int, int, float]]] = {}
+_waiting_lock = threading.Lock()
+_last_progress_edit: Dict[str, float] = {}
 
-# Cache students list per group (dict index → name) for fast lookup after spin
-_students_cache: Dict[str, Dict[int, str]] = defaultdict(dict)
+# Served by the Flask /metrics endpoint from the snapshot main() keeps dumping
+_RENDER_SECONDS = histogram(
+    "matstat_render_seconds", "Wall time of one group render", ["group", "status"], RENDER_BUCKETS
+)
+_SPIN_TO_VIDEO = histogram(
+    "matstat_spin_to_video_seconds", "Spin button press to video note sent", ["path"],
+    (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 300, 900),
+)
+_VIDEO_SENDS = counter("matstat_video_sends_total", "Spin videos sent, by delivery", ["via"])
 
 
 # ---------------------------------------------------------------------------
-# Background watchdog – spreadsheet change detection / regeneration
+# Render queue – every render (watchdog or user) goes through it
 # ---------------------------------------------------------------------------
 
-def _regenerate_and_release(group: str):
+def _render_group(group: str, progress) -> str:
+    t0 = time.monotonic()
     try:
-        generate_group_videos(group)
-    finally:
-        with _rendering_lock:
-            _rendering.discard(group)
+        snapshot = take_snapshot(group)
+        generate_group_videos(
+            group, snapshot=snapshot, jobs=RENDER_JOBS, pool_size=SPIN_POOL_SIZE, progress=progress
+        )
+    except BaseException:
+        _RENDER_SECONDS.observe(time.monotonic() - t0, group=group, status="failed")
+        raise
+    _RENDER_SECONDS.observe(time.monotonic() - t0, group=group, status="done")
+    _file_ids.prune()  # forget videos of generations collected meanwhile
+    threading.Thread(target=_preupload_group, args=(group,), daemon=True).start()
+    return snapshot.version
+
+
+_render_queue = RenderQueue(
+    _render_group, pathlib.Path("videos") / ".render_queue.json", workers=RENDER_WORKERS
+)
+
+
+def _progress_text(job: RenderJob | None, group: str) -> str:
+    if job is None or job.state == "queued":
+        ahead = _render_queue.position(group)
+        return f"Колесо для {group} в очереди на отрисовку" + (f" (перед ним {ahead})" if ahead else "") + " …"
+    return f"Рисую колесо для {group}: {job.done}/{job.total or '?'} …"
+
+
+def _on_render_event(job: RenderJob, event: str):
+    if event == "progress":
+        now = time.monotonic()
+        if now - _last_progress_edit.get(job.group, 0.0) < PROGRESS_EDIT_SEC:
+            return
+        _last_progress_edit[job.group] = now
+        with _waiting_lock:
+            waiting = list(_waiting.get(job.group, ()))
+        for chat_id, msg_id, _ in waiting:
+            try:
+                bot.edit_message_text(_progress_text(job, job.group), chat_id, msg_id)
+            except Exception:
+                pass
+        return
 
+    # finished – hand the spin to everybody who asked for it meanwhile
+    with _waiting_lock:
+        waiting = _waiting.pop(job.group, [])
+    for chat_id, msg_id, pressed_at in waiting:
+        try:
+            bot.delete_message(chat_id, msg_id)
+        except Exception:
+            pass
+        try:
+            _spin(chat_id, job.group, pressed_at, path="after_render")
+        except Exception as exc:
+            print(f"[bot] delayed spin for {job.group} failed: {exc}")
 
-def _watchdog_loop():
-    while True:
-        for group in GROUPS:
-            try:
-                if has_table_changed(group):
-                    with _rendering_lock:
-                        if group in _rendering:
-                            continue
-                        _rendering.add(group)
-                    threading.Thread(
-                        target=_regenerate_and_release, args=(group,), daemon=True
-                    ).start()
-            except Exception as exc:
-                print(f"[watchdog] error for {group}: {exc}")
-        time.sleep(CHECK_INTERVAL_SEC)
 
+_render_queue.add_listener(_on_render_event)
+gauge("matstat_render_queue_depth", "Render jobs waiting").set_function(
+    lambda: _render_queue.depth()[0]
+)
+gauge("matstat_render_running", "Render jobs in progress").set_function(
+    lambda: _render_queue.depth()[1]
+)
+
+
+# ---------------------------------------------------------------------------
+# Background watchdog – adaptive spreadsheet polling / regeneration
+# ---------------------------------------------------------------------------
+
+def _on_poll_results(results):
+    for group, res in results.items():
+        if res.error is not None:
+            print(f"[watchdog] error for {group} ({res.seconds:.2f}s): {res.error}")
+            continue
+        if not res.changed:
+            continue
+        try:
+            version = take_snapshot(group).version
+        except Exception as exc:
+            print(f"[watchdog] snapshot of {group} failed: {exc}")
+            continue
+        _render_queue.submit(group, version, priority=PRIORITY_WATCHDOG)
+
+
+# Polls changed groups often and quiet ones rarely; the lease keeps other
+# processes sharing services/sheet_cache from polling at the same time.
+_poller = PollScheduler(GROUPS, check_all_groups, lease=poll_lease)
+
+
+def _watchdog_loop():
+    _poller.run_forever(_on_poll_results)
 
-threading.Thread(target=_watchdog_loop, daemon=True).start()
 
 # ---------------------------------------------------------------------------
 # Helpers – video retrieval / student name extraction
 # ---------------------------------------------------------------------------
 
-def _ensure_videos_ready(group: str):
-    """Generate missing videos synchronously if none exist yet."""
+def _videos_ready(group: str) -> bool:
+    if _manifests.get(group) is not None:
+        return True
+    # Directories rendered before manifests existed
     dir_path = pathlib.Path("videos") / group
-    if not dir_path.exists() or not any(dir_path.glob("*.mp4")):
-        generate_group_videos(group)
+    return dir_path.exists() and any(
+        not p.stem.endswith("_new") for p in dir_path.glob("*.mp4")
+    )
 
 
 def _pick_random_video(group: str) -> pathlib.Path:
+    """Fallback for directories without a manifest: scan and weigh by filename."""
     dir_path = pathlib.Path("videos") / group
     videos = [p for p in dir_path.glob("*.mp4") if not p.stem.endswith("_new")]
     if not videos:
@@ -98,15 +209,81 @@ def _pick_random_video(group: str) -> pathlib.Path:
 
 
 
+def _pick_from_manifest(group: str) -> tuple[pathlib.Path, str] | None:
+    """Alias‑table pick from the group's manifest: one ``stat``, no scans."""
+    manifest = _manifests.get(group)
+    if manifest is None:
+        return None
+    return manifest.pick()
+
+
 def _student_name_from_filename(group: str, path: pathlib.Path) -> str:
-    cache = _students_cache[group]
-    try:
-        idx = int(path.stem.split("_")[0])
-    except (ValueError, IndexError):
+    # ``{idx:02d}_{Name_With_Underscores}_{prob:.6f}.mp4`` – the name is taken
+    # from the same snapshot that drew the wedges, so no network round‑trip
+    parts = path.stem.split("_")
+    if len(parts) < 3 or not parts[0].isdigit():
         return "неизвестный студент"
-    if idx not in cache:
-        cache.update({i: s["name"] for i, s in enumerate(fetch_students(group))})
-    return cache.get(idx, "неизвестный студент")
+    return " ".join(parts[1:-1]) or "неизвестный студент"
+
+
+# ---------------------------------------------------------------------------
+# Video delivery – cached file_id first, upload only when needed
+# ---------------------------------------------------------------------------
+
+def _remember_file_id(video_path: pathlib.Path, msg) -> None:
+    note = getattr(msg, "video_note", None)
+    if note is not None:
+        _file_ids.put(video_path, note.file_id)
+
+
+def _send_spin_video(chat_id: int, video_path: pathlib.Path):
+    file_id = _file_ids.get(video_path)
+    if file_id is not None:
+        try:
+            msg = bot.send_video_note(chat_id, file_id, length=VIDEO_NOTE_LENGTH)
+            _VIDEO_SENDS.inc(via="file_id")
+            return msg
+        except ApiTelegramException as exc:
+            print(f"[bot] cached file_id of {video_path} rejected ({exc}) – uploading")
+            _file_ids.discard(video_path)
+
+    # Notify about upload – Telegram shows a circle in title bar / chat list
+    bot.send_chat_action(chat_id, "upload_video_note")
+    with open(video_path, "rb") as vf:
+        msg = bot.send_video_note(chat_id, vf, length=VIDEO_NOTE_LENGTH)
+    _VIDEO_SENDS.inc(via="upload")
+    _remember_file_id(video_path, msg)
+    return msg
+
+
+def _preupload_group(group: str):
+    """Upload *group*'s videos not yet known to Telegram to PREUPLOAD_CHAT_ID."""
+    if not PREUPLOAD_CHAT_ID:
+        return
+    manifest = _manifests.get(group)
+    if manifest is not None:
+        videos = list(manifest.files)
+    else:
+        videos = sorted((pathlib.Path("videos") / group).glob("*.mp4"))
+    with _preupload_lock:
+        for video_path in videos:
+            if video_path.stem.endswith("_new") or _file_ids.get(video_path) is not None:
+                continue
+            try:
+                with open(video_path, "rb") as vf:
+                    msg = bot.send_video_note(
+                        PREUPLOAD_CHAT_ID, vf, length=VIDEO_NOTE_LENGTH, disable_notification=True
+                    )
+                _remember_file_id(video_path, msg)
+                bot.delete_message(PREUPLOAD_CHAT_ID, msg.message_id)
+            except Exception as exc:
+                print(f"[preupload] {video_path} failed: {exc}")
+
+
+def _preupload_all():
+    _file_ids.prune()
+    for group in GROUPS:
+        _preupload_group(group)
 
 
 # ---------------------------------------------------------------------------
@@ -136,6 +313,7 @@ def _cmd_spin(msg):
 
 @bot.callback_query_handler(func=lambda c: c.data.startswith("spin:"))
 def _cb_spin_group(call):
+    pressed_at = time.monotonic()
     group = call.data.split(":", 1)[1]
     # Delete the prompt with buttons for cleanliness
     try:
@@ -143,30 +321,73 @@ def _cb_spin_group(call):
     except Exception:
         pass
 
-    # Ensure we have up‑to‑date videos → may block shortly on first use
-    _ensure_videos_ready(group)
+    chat_id = call.message.chat.id
+    # Somebody is using this group right now – look for fresh scores soon,
+    # but at most once per minimum poll interval however often they press
+    _poller.check_now([group], min_age=_poller.min_interval)
+    if not _videos_ready(group):
+        # First use – queue the render with user priority and report progress
+        # instead of holding this handler for minutes; the spin follows
+        # automatically once the videos exist.
+        status = bot.send_message(chat_id, _progress_text(_render_queue.status(group), group))
+        with _waiting_lock:
+            _waiting.setdefault(group, []).append((chat_id, status.message_id, pressed_at))
+        _render_queue.submit(group, priority=PRIORITY_USER)
+        return
+
+    _spin(chat_id, group, pressed_at)
+
 
+def _spin(chat_id: int, group: str, pressed_at: float | None = None, *, path: str = "ready"):
     # Pick video & extract student name before sending
-    try:
-        video_path = _pick_random_video(group)
-    except FileNotFoundError:
-        bot.send_message(call.message.chat.id, "Че‑то я лагаю, попробуй крутануть позже, мб оживу")
-        return
-    student_name = _student_name_from_filename(group, video_path)
+    picked = _pick_from_manifest(group)
+    if picked is not None:
+        video_path, student_name = picked
+    else:
+        try:
+            video_path = _pick_random_video(group)
+        except FileNotFoundError:
+            bot.send_message(chat_id, "Че‑то я лагаю, попробуй крутануть позже, мб оживу")
+            return
+        student_name = _student_name_from_filename(group, video_path)
 
-    # Notify about upload – Telegram shows a circle in title bar / chat list
-    bot.send_chat_action(call.message.chat.id, "upload_video_note")
+    # Send video note (circle) – by file_id when Telegram already has it
+    _send_spin_video(chat_id, video_path)
+    if pressed_at is not None:
+        _SPIN_TO_VIDEO.observe(time.monotonic() - pressed_at, path=path)
+
+    # Reveal once the wheel has stopped; the handler worker is free right away
+    _reveal_scheduler().call_later(REVEAL_DELAY_SEC, _reveal_winner, chat_id, student_name)
 
-    # Send video note (circle)
-    with open(video_path, "rb") as vf:
-        bot.send_video_note(call.message.chat.id, vf, length=360)
 
-    # Pause so the user actually sees the wheel before revealing the name
-    time.sleep(15)
+def _reveal_scheduler() -> RevealScheduler:
+    global _reveals
+    with _reveals_lock:
+        if _reveals is None:
+            _reveals = RevealScheduler()
+        return _reveals
 
-    bot.send_message(call.message.chat.id, f"<b>→ {student_name}</b>")
 
+def _reveal_winner(chat_id: int, student_name: str):
+    bot.send_message(chat_id, f"<b>→ {student_name}</b>")
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+def main():
+    _render_queue.start()  # resumes renders queued / interrupted before a restart
+    REGISTRY.start_dumping("bot")  # picked up by the Flask /metrics endpoint
+    threading.Thread(target=_watchdog_loop, daemon=True).start()
+    threading.Thread(target=_preupload_all, daemon=True).start()
+    print("[bot] up & running – polling …")
+    try:
+        bot.infinity_polling()
+    finally:
+        if _reveals is not None:
+            _reveals.stop()
 
-print("[bot] up & running – polling …")
 
-bot.infinity_polling()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import threading
+from typing import Dict, Optional
+
+from services.atomic_file import try_atomic_write
+
+__all__ = ["FileIdCache"]
+
+
+class FileIdCache:
+    """Telegram ``file_id`` per local video, persisted as JSON.
+
+    An entry is keyed by resolved path and remembers the file's
+    ``st_mtime_ns`` and ``st_size`` at upload time; a re‑rendered (replaced)
+    video no longer matches and is uploaded afresh.  Writes are atomic (tmp + rename), so a
+    crash never leaves a torn cache behind.
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._load()
+
+    # ------------------------------------------------------------------
+    def get(self, video: str | pathlib.Path) -> Optional[str]:
+        """``file_id`` of *video* if it was uploaded in its current form."""
+        stamp = _stamp(video)
+        with self._lock:
+            entry = self._entries.get(_key(video))
+        if entry is None or stamp is None or entry.get("stamp") != stamp:
+            return None
+        return entry.get("file_id")
+
+    def put(self, video: str | pathlib.Path, file_id: str) -> None:
+        stamp = _stamp(video)
+        if stamp is None:
+            return
+        with self._lock:
+            self._entries[_key(video)] = {"file_id": file_id, "stamp": stamp}
+            self._save()
+
+    def discard(self, video: str | pathlib.Path) -> None:
+        with self._lock:
+            if self._entries.pop(_key(video), None) is not None:
+                self._save()
+
+    def prune(self) -> int:
+        """Drop entries whose file is gone or was replaced; returns the count."""
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if _stamp(k) != e.get("stamp")]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._save()
+        return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> Dict[str, dict]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self) -> None:
+        try_atomic_write(self.path, json.dumps(self._entries, ensure_ascii=False, indent=1))
+
+
+def _key(video: str | pathlib.Path) -> str:
+    return str(pathlib.Path(video).resolve())
+
+
+def _stamp(video: str | pathlib.Path) -> Optional[list]:
+    try:
+        st = os.stat(video)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
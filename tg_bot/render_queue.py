@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import itertools
+import json
+import pathlib
+import threading
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+from services.atomic_file import try_atomic_write
+
+__all__ = [
+    "PRIORITY_USER",
+    "PRIORITY_WATCHDOG",
+    "RenderJob",
+    "RenderQueue",
+]
+
+# Lower runs first: somebody waiting in a chat beats a background refresh
+PRIORITY_USER: int = 0
+PRIORITY_WATCHDOG: int = 10
+
+# render_fn(group, progress) → version that was actually rendered
+RenderFn = Callable[[str, Callable[[int, int], None]], Optional[str]]
+# listener(job, event) with event in {"progress", "finished"}
+Listener = Callable[["RenderJob", str], None]
+
+
+@dataclass
+class RenderJob:
+    group: str
+    version: Optional[str]   # snapshot version to render; None → whatever is current
+    priority: int
+    seq: int                 # FIFO among equal priorities
+    state: str = "queued"    # queued | running | done | failed
+    done: int = 0            # finished videos of the running batch
+    total: int = 0
+    error: Optional[str] = None
+
+    @property
+    def sort_key(self) -> tuple[int, int]:
+        return self.priority, self.seq
+
+
+class RenderQueue:
+    """Bounded, deduplicating, persistent queue of per‑group render jobs.
+
+    * At most *workers* renders run at a time, and never two for one group.
+    * One pending job per group: a new request for a group that is already
+      queued only raises its priority / moves it to the newer version; a
+      request for the version currently being rendered (or already on disk)
+      is dropped.
+    * Queued and running jobs plus the last rendered version of every group
+      are kept in *state_path* (JSON, tmp + rename); after a restart the
+      interrupted jobs are queued again.
+    * Listeners get ``(job, "progress")`` after every video and
+      ``(job, "finished")`` once a job is done or failed.
+    """
+
+    def __init__(
+        self,
+        render_fn: RenderFn,
+        state_path: str | pathlib.Path | None,
+        *,
+        workers: int = 1,
+    ) -> None:
+        self.render_fn = render_fn
+        self.state_path = pathlib.Path(state_path) if state_path is not None else None
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        self._pending: Dict[str, RenderJob] = {}
+        self._running: Dict[str, RenderJob] = {}
+        self._rendered: Dict[str, Optional[str]] = {}
+        self._listeners: List[Listener] = []
+        self._seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # public API
+    # ------------------------------------------------------------------
+    def start(self) -> "RenderQueue":
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"render-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        """Let running renders finish, keep the queued ones for the next start."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join()
+
+    def add_listener(self, fn: Listener) -> None:
+        self._listeners.append(fn)
+
+    def submit(
+        self,
+        group: str,
+        version: Optional[str] = None,
+        *,
+        priority: int = PRIORITY_WATCHDOG,
+    ) -> Optional[RenderJob]:
+        """Queue a render of *group* (at *version*); returns the job in charge.
+
+        ``None`` means *version* is already rendered and nothing was queued.
+        """
+        with self._cond:
+            pending = self._pending.get(group)
+            if pending is not None:
+                pending.priority = min(pending.priority, priority)
+                if version is not None:
+                    pending.version = version
+                self._save()
+                return pending
+
+            running = self._running.get(group)
+            if running is not None and (version is None or running.version == version):
+                return running
+            if running is None and version is not None and self._rendered.get(group) == version:
+                return None
+
+            job = RenderJob(group, version, priority, next(self._seq))
+            self._pending[group] = job
+            self._save()
+            self._cond.notify()
+            return job
+
+    def status(self, group: str) -> Optional[RenderJob]:
+        """Running or queued job of *group* (a copy), else ``None``."""
+        with self._cond:
+            job = self._running.get(group) or self._pending.get(group)
+            return None if job is None else RenderJob(**asdict(job))
+
+    def position(self, group: str) -> int:
+        """Jobs that start before *group*'s queued job (0 → next / running)."""
+        with self._cond:
+            job = self._pending.get(group)
+            if job is None:
+                return 0
+            return sum(other.sort_key < job.sort_key for other in self._pending.values())
+
+    def depth(self) -> tuple[int, int]:
+        """(queued, running) job counts."""
+        with self._cond:
+            return len(self._pending), len(self._running)
+
+    def rendered_version(self, group: str) -> Optional[str]:
+        with self._cond:
+            return self._rendered.get(group)
+
+    # ------------------------------------------------------------------
+    # worker
+    # ------------------------------------------------------------------
+    def _next_job(self) -> Optional[RenderJob]:
+        """Highest‑priority pending job whose group is not rendering (lock held)."""
+        ready = [j for g, j in self._pending.items() if g not in self._running]
+        return min(ready, key=lambda j: j.sort_key, default=None)
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None and not self._stopped:
+                    self._cond.wait()
+                    job = self._next_job()
+                if self._stopped:
+                    return
+                del self._pending[job.group]
+                job.state = "running"
+                self._running[job.group] = job
+                self._save()
+
+            def progress(done: int, total: int, job: RenderJob = job) -> None:
+                job.done, job.total = done, total
+                self._emit(job, "progress")
+
+            try:
+                rendered = self.render_fn(job.group, progress)
+            except Exception as exc:
+                job.state, job.error = "failed", repr(exc)
+                print(f"[render-queue] {job.group} failed: {exc!r}")
+            else:
+                job.state = "done"
+                job.version = rendered if rendered is not None else job.version
+
+            with self._cond:
+                del self._running[job.group]
+                if job.state == "done":
+                    self._rendered[job.group] = job.version
+                self._save()
+                self._cond.notify_all()
+            self._emit(job, "finished")
+
+    def _emit(self, job: RenderJob, event: str) -> None:
+        for fn in list(self._listeners):
+            try:
+                fn(job, event)
+            except Exception as exc:  # a broken listener must not stop renders
+                print(f"[render-queue] listener failed on {event}: {exc!r}")
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+    def _load(self) -> None:
+        if self.state_path is None:
+            return
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self._rendered = dict(state.get("rendered") or {})
+        # Interrupted renders go first, then the queue in its old order
+        saved = (state.get("running") or []) + (state.get("pending") or [])
+        for raw in saved:
+            if raw.get("group") in self._pending:
+                continue
+            job = RenderJob(raw["group"], raw.get("version"), int(raw.get("priority", PRIORITY_WATCHDOG)),
+                            next(self._seq))
+            self._pending[job.group] = job
+
+    def _save(self) -> None:
+        """Write the queue state (lock held)."""
+        if self.state_path is None:
+            return
+        state = {
+            "pending": [_persisted(j) for j in sorted(self._pending.values(), key=lambda j: j.sort_key)],
+            "running": [_persisted(j) for j in self._running.values()],
+            "rendered": self._rendered,
+        }
+        try_atomic_write(self.state_path, json.dumps(state, ensure_ascii=False, indent=1))
+
+
+def _persisted(job: RenderJob) -> dict:
+    return {"group": job.group, "version": job.version, "priority": job.priority}
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple
+
+__all__ = ["RevealScheduler"]
+
+# Threads that run due callbacks, so one slow Telegram call cannot hold
+# back the reveals queued behind it
+DISPATCH_WORKERS: int = 4
+
+_Entry = Tuple[float, int, Callable[..., Any], tuple]
+
+
+class RevealScheduler:
+    """Run callbacks after a delay without parking a thread per callback.
+
+    Pending calls live in a heap ordered by due time; one daemon thread
+    sleeps until the earliest one is due and hands it to a small worker
+    pool.  Thousands of pending reveals cost one heap entry each.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = DISPATCH_WORKERS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._heap: List[_Entry] = []
+        self._seq = itertools.count()  # FIFO among equal due times
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reveal")
+        self._thread = threading.Thread(target=self._run, name="reveal-scheduler", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    def call_later(self, delay: float, fn: Callable[..., Any], *args: Any) -> None:
+        """Run ``fn(*args)`` once *delay* seconds have passed."""
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("scheduler is stopped")
+            heapq.heappush(self._heap, (self._clock() + delay, next(self._seq), fn, args))
+            self._cond.notify()
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def stop(self, *, drain: bool = True) -> None:
+        """Stop the scheduler; with *drain* the pending calls run immediately."""
+        with self._cond:
+            self._stopped = True
+            remaining, self._heap = self._heap, []
+            self._cond.notify()
+        self._thread.join()
+        if drain:
+            for _, _, fn, args in sorted(remaining):
+                self._pool.submit(self._invoke, fn, args)
+        self._pool.shutdown(wait=drain)
+
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    timeout = self._heap[0][0] - self._clock()
+                    if timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                _, _, fn, args = heapq.heappop(self._heap)
+            self._pool.submit(self._invoke, fn, args)
+
+    @staticmethod
+    def _invoke(fn: Callable[..., Any], args: tuple) -> None:
+        try:
+            fn(*args)
+        except Exception as exc:  # a failed reveal must not kill the scheduler
+            print(f"[reveal] {getattr(fn, '__name__', fn)} failed: {exc}")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import threading
+from typing import Callable
+
+import numpy as np
+
+from . import wheel_config as cfg
+
+__all__ = [
+    "FrameAtlas",
+    "atlas_path",
+    "prune_atlases",
+]
+
+# Renders an RGB frame for a clockwise angle (deg); built lazily on first miss
+FrameRenderer = Callable[[float], np.ndarray]
+
+
+# ---------------------------------------------------------------------------
+# Location helpers – one directory per group, one file pair per version
+# ---------------------------------------------------------------------------
+
+def atlas_path(group: str, key: str, root: str | pathlib.Path | None = None) -> pathlib.Path:
+    """Base path (without suffix) of the atlas for *group* / *key*."""
+    return pathlib.Path(root or cfg.ATLAS_DIR) / group / key
+
+
+def prune_atlases(group: str, keep_key: str, root: str | pathlib.Path | None = None) -> None:
+    """Delete every atlas of *group* that does not belong to *keep_key*.
+
+    Called once per regeneration, so an atlas never outlives the group
+    snapshot it was rendered from.
+    """
+    group_dir = pathlib.Path(root or cfg.ATLAS_DIR) / group
+    if not group_dir.is_dir():
+        return
+    for path in group_dir.iterdir():
+        if path.name.split(".", 1)[0] != keep_key:
+            try:
+                path.unlink()
+            except OSError:
+                pass  # best‑effort
+
+
+# ---------------------------------------------------------------------------
+# Public – memory‑mapped frame cache at quantised angles
+# ---------------------------------------------------------------------------
+
+class FrameAtlas:
+    """Frames of one wheel face pre‑rendered at ``step_deg`` angle steps.
+
+    Frames live in a sparse memory‑mapped file (``<key>.frames``) next to a
+    one‑byte‑per‑slot fill map (``<key>.filled``), so every process rendering
+    the same group shares them through the page cache.  A slot is rendered
+    on first use; concurrent writers of the same slot write identical bytes,
+    and the fill flag is only set after the frame itself is in place.
+    """
+
+    def __init__(
+        self,
+        base: pathlib.Path,
+        size_px: int,
+        renderer: Callable[[], FrameRenderer],
+        *,
+        step_deg: float = cfg.ATLAS_STEP_DEG,
+    ) -> None:
+        self.step_deg = step_deg
+        self.n_slots = int(round(360.0 / step_deg))
+        self.size_px = size_px
+        self._renderer_factory = renderer
+        self._renderer: FrameRenderer | None = None
+        self._lock = threading.Lock()
+
+        base.parent.mkdir(parents=True, exist_ok=True)
+        shape = (self.n_slots, size_px, size_px, 3)
+        self.frames = _open_sparse(base.with_suffix(".frames"), shape)
+        self.filled = _open_sparse(base.with_suffix(".filled"), (self.n_slots,))
+
+    # ------------------------------------------------------------------
+    def indices(self, thetas_cw: np.ndarray) -> np.ndarray:
+        """Slot index of every angle in *thetas_cw* (deg, any range)."""
+        q = np.rint(np.mod(thetas_cw, 360.0) / self.step_deg).astype(np.int64)
+        return q % self.n_slots
+
+    def frame_at(self, slot: int) -> np.ndarray:
+        """Frame stored in *slot*, rendering it first if still missing."""
+        if not self.filled[slot]:
+            self.frames[slot] = self._render(slot * self.step_deg)
+            self.filled[slot] = 1
+        return self.frames[slot]
+
+    def frame(self, theta_cw: float) -> np.ndarray:
+        return self.frame_at(int(self.indices(np.asarray([theta_cw]))[0]))
+
+    @property
+    def coverage(self) -> float:
+        """Fraction of slots already rendered."""
+        return float(np.count_nonzero(self.filled)) / self.n_slots
+
+    # ------------------------------------------------------------------
+    def _render(self, theta_cw: float) -> np.ndarray:
+        if self._renderer is None:
+            with self._lock:
+                if self._renderer is None:
+                    self._renderer = self._renderer_factory()
+        return self._renderer(theta_cw)
+
+
+def _open_sparse(path: pathlib.Path, shape: tuple[int, ...]) -> np.memmap:
+    """Open (creating as a sparse, zero‑filled file if needed) a uint8 memmap."""
+    size = int(np.prod(shape))
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != size:
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+    return np.memmap(path, dtype=np.uint8, mode="r+", shape=shape)
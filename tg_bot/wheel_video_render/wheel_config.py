@@ -25,3 +25,12 @@ LOGO_PATH = "static/images/wheel-logo.png"
 
 LOGO_ZOOM = 0.11
 
+# Frame atlas (opt‑in: pre‑rendered rotations shared by all videos of a group)
+ATLAS_DIR      = "videos/.atlas"
+ATLAS_STEP_DEG = 0.1   # angle quantisation; 3600 slots ≈ 4.4 GB sparse at 640 px
+
+# Frames closer than this (deg) to the previous distinct one are reused as is
+ELIDE_TOL_DEG  = 0.01
+
+# Superseded video generations stay on disk this long (s) for in‑flight sends
+GENERATION_GRACE_SEC = 600
@@ -1,11 +1,15 @@
 from __future__ import annotations
 import io, math
+from typing import TYPE_CHECKING
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 
 from . import wheel_config as cfg
-from .wheel_helpers import fetch_students, weights, hsl_color, trim_name
+from .wheel_helpers import hsl_color, trim_name
+
+if TYPE_CHECKING:  # pragma: no cover – import only for annotations
+    from .wheel_snapshot import GroupSnapshot
 
 # ────────────────────────────────────────────────────────────────────────────
 # Internal helper: create figure/axes without margins (exact centre alignment)
@@ -25,23 +29,19 @@ def _fig_ax():
 # Rotating coloured layer (sectors + labels)
 # ---------------------------------------------------------------------------
 
-def draw_rotating_layer(group: str) -> bytes:
-    students = fetch_students(group)
-    probs    = weights(students)
-
-    for i, s in enumerate(students):
-        s["prob"], s["color"] = probs[i], hsl_color(i, len(students))
+def draw_rotating_layer(snapshot: GroupSnapshot) -> bytes:
+    n = len(snapshot)
 
-    sizes  = [s["prob"]  for s in students]
-    labels = [trim_name(s["name"], s["prob"]) for s in students]
-    colors = [s["color"] for s in students]
+    sizes  = list(snapshot.weights)
+    labels = [trim_name(name, prob) for name, prob in zip(snapshot.names, sizes)]
+    colors = [hsl_color(i, n) for i in range(n)]
 
     fig, ax = _fig_ax()
 
     ax.pie(
         sizes,
         radius=cfg.WHEEL_R,
-        labels=["" for _ in students],
+        labels=["" for _ in range(n)],
         startangle=0,
         counterclock=False,
         colors=colors,
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import collections
+import os
+import pathlib
+import subprocess
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, List, Sequence
+
+import numpy as np
+
+from .wheel_profile import NULL_PROFILER
+
+__all__ = [
+    "ffmpeg_exe",
+    "FFmpegPipeWriter",
+    "encode_frames",
+]
+
+# ---------------------------------------------------------------------------
+# Encoder defaults (same output as the moviepy backend)
+# ---------------------------------------------------------------------------
+CODEC: str = "libx264"
+PRESET: str = "slow"
+CRF: int = 18
+PREFETCH_PER_WORKER: int = 4  # frames kept in flight per producer thread
+
+
+def ffmpeg_exe() -> str:
+    """Path of the ffmpeg binary (moviepy's bundled one if available)."""
+    env = os.getenv("FFMPEG_BINARY")
+    if env:
+        return env
+    try:
+        import imageio_ffmpeg  # moviepy dependency
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:  # pragma: no cover – fall back to $PATH
+        return "ffmpeg"
+
+
+# ---------------------------------------------------------------------------
+# Public – raw RGB frames → ffmpeg stdin
+# ---------------------------------------------------------------------------
+
+class FFmpegPipeWriter:
+    """Stream ``uint8`` RGB frames of a fixed size into an x264 encode."""
+
+    def __init__(
+        self,
+        out_file: str | pathlib.Path,
+        size: tuple[int, int],
+        fps: int,
+        *,
+        codec: str = CODEC,
+        preset: str = PRESET,
+        crf: int = CRF,
+        threads: int | None = None,
+        ffmpeg_params: Sequence[str] = ("-pix_fmt", "yuv420p", "-movflags", "faststart"),
+    ) -> None:
+        self.out_file = pathlib.Path(out_file)
+        self.size = size
+        w, h = size
+        cmd: List[str] = [
+            ffmpeg_exe(), "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}", "-r", str(fps),
+            "-i", "-",
+            "-an", "-c:v", codec, "-preset", preset, "-crf", str(crf),
+        ]
+        if threads is not None:
+            cmd += ["-threads", str(threads)]
+        cmd += [*ffmpeg_params, str(self.out_file)]
+
+        # stderr goes to a file so a chatty ffmpeg can never block the pipe
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self._stderr)
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame.shape[:2] != (self.size[1], self.size[0]):
+            raise ValueError(f"frame of shape {frame.shape} does not match {self.size}")
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+        except BrokenPipeError:
+            self._fail()
+
+    def peak_rss_mb(self) -> float:
+        """ffmpeg's peak RSS so far (Linux ``VmHWM``; 0.0 where unavailable)."""
+        try:
+            with open(f"/proc/{self._proc.pid}/status", encoding="ascii") as fh:
+                for line in fh:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) / 1024
+        except (OSError, ValueError):
+            pass
+        return 0.0
+
+    def close(self) -> None:
+        if self._proc.stdin and not self._proc.stdin.closed:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        if self._proc.wait() != 0:
+            self._fail()
+        self._stderr.close()
+
+    def abort(self) -> None:
+        """Kill the encoder and drop the partial output."""
+        self._proc.kill()
+        self._proc.wait()
+        self._stderr.close()
+        try:
+            self.out_file.unlink()
+        except OSError:
+            pass
+
+    def _fail(self) -> None:
+        """Raise with ffmpeg's stderr tail; a truncated output must not survive."""
+        self._proc.wait()
+        self._stderr.seek(0)
+        tail = self._stderr.read()[-2000:].decode("utf-8", "replace")
+        self._stderr.close()
+        try:
+            self.out_file.unlink()
+        except OSError:
+            pass
+        raise RuntimeError(f"ffmpeg failed for {self.out_file} (rc={self._proc.returncode}):\n{tail}")
+
+    def __enter__(self) -> "FFmpegPipeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def encode_frames(
+    make_frame: Callable[[int], np.ndarray],
+    n_frames: int,
+    out_file: str | pathlib.Path,
+    *,
+    size: tuple[int, int],
+    fps: int,
+    repeats: Sequence[int] | None = None,
+    threads: int | None = None,
+    workers: int | None = None,
+    prefetch: int | None = None,
+    profiler: Any = None,
+) -> str:
+    """Produce frames ``make_frame(0 … n_frames‑1)`` and encode them in order.
+
+    Frames are produced ahead of the encoder by a bounded thread pool
+    (*workers* threads, at most *prefetch* frames in flight) – Pillow and
+    NumPy release the GIL for the heavy lifting – and written to ffmpeg
+    strictly in order.  With *repeats*, frame ``i`` is generated once and
+    written ``repeats[i]`` times (constant frame rate output).
+
+    With a *profiler* (:class:`wheel_profile.RenderProfiler`), pipe writes
+    are timed as ``encode_write``, the final wait for x264 as
+    ``encode_flush``, and ffmpeg's peak RSS is recorded.
+    """
+    if repeats is not None and len(repeats) != n_frames:
+        raise ValueError("repeats must hold one count per produced frame")
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    if prefetch is None:
+        prefetch = workers * PREFETCH_PER_WORKER
+
+    prof = profiler if profiler is not None else NULL_PROFILER
+    writer = FFmpegPipeWriter(out_file, size, fps, threads=threads)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            in_flight: Deque[tuple[int, Future]] = collections.deque()
+
+            def flush_one() -> None:
+                i, fut = in_flight.popleft()
+                frame = fut.result()
+                with prof.stage("encode_write"):
+                    for _ in range(1 if repeats is None else repeats[i]):
+                        writer.write(frame)
+
+            for i in range(n_frames):
+                in_flight.append((i, pool.submit(make_frame, i)))
+                if len(in_flight) >= prefetch:
+                    flush_one()
+            while in_flight:
+                flush_one()
+    except BaseException:
+        writer.abort()
+        raise
+    if prof.enabled:
+        # Sampled before stdin closes: afterwards the process may be gone
+        prof.peak("encoder_rss_mb", writer.peak_rss_mb())
+    with prof.stage("encode_flush"):
+        writer.close()
+
+    return str(out_file)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+import time
+from typing import List
+
+from . import wheel_config as cfg
+
+__all__ = [
+    "CURRENT",
+    "new_generation_dir",
+    "current_dir",
+    "switch_current",
+    "collect_garbage",
+]
+
+# ``videos/<group>/current`` → ``gen-…`` symlink naming the live generation
+CURRENT: str = "current"
+_GEN_PREFIX: str = "gen-"
+# Touched in a generation when it stops being current (start of its grace)
+_RETIRED: str = ".retired"
+
+
+def new_generation_dir(group_dir: pathlib.Path, version: str) -> pathlib.Path:
+    """Create and return an empty ``gen-<time>-<version>`` directory."""
+    group_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    for n in range(1000):
+        name = f"{_GEN_PREFIX}{stamp}-{version}" + (f"-{n}" if n else "")
+        gen = group_dir / name
+        try:
+            gen.mkdir()
+            return gen
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"no free generation directory in {group_dir}")
+
+
+def current_dir(group_dir: pathlib.Path) -> pathlib.Path | None:
+    """Resolved live generation of *group_dir*, if any."""
+    link = group_dir / CURRENT
+    return link.resolve() if link.is_dir() else None
+
+
+def switch_current(group_dir: pathlib.Path, gen_dir: pathlib.Path) -> pathlib.Path | None:
+    """Point ``current`` at *gen_dir* in one atomic rename.
+
+    A relative symlink is created under a temporary name and renamed over
+    ``current``, so readers see either the old or the new generation, never
+    a mix.  Returns the generation that was current before (now retired).
+    """
+    previous = current_dir(group_dir)
+    tmp = group_dir / f".{CURRENT}.tmp"
+    try:
+        tmp.unlink()
+    except FileNotFoundError:
+        pass
+    os.symlink(gen_dir.name, tmp, target_is_directory=True)
+    os.replace(tmp, group_dir / CURRENT)
+
+    if previous is not None and previous != gen_dir.resolve():
+        try:
+            (previous / _RETIRED).touch()
+        except OSError:
+            pass
+        return previous
+    return None
+
+
+def collect_garbage(
+    group_dir: pathlib.Path,
+    grace_sec: float = cfg.GENERATION_GRACE_SEC,
+    *,
+    now: float | None = None,
+) -> List[pathlib.Path]:
+    """Delete generations retired (or abandoned) more than *grace_sec* ago.
+
+    The live generation is never touched.  A generation that never went
+    live (crashed render) counts as abandoned once nothing in it changed for
+    *grace_sec*.  Returns the removed directories.
+    """
+    now = time.time() if now is None else now
+    live = current_dir(group_dir)
+    removed: List[pathlib.Path] = []
+    if not group_dir.is_dir():
+        return removed
+
+    for gen in group_dir.iterdir():
+        if not gen.name.startswith(_GEN_PREFIX) or gen.is_symlink() or not gen.is_dir():
+            continue
+        if live is not None and gen.resolve() == live:
+            continue
+        try:
+            retired = gen / _RETIRED
+            if retired.exists():
+                since = retired.stat().st_mtime
+            else:
+                since = max([gen.stat().st_mtime] + [p.stat().st_mtime for p in gen.iterdir()])
+        except OSError:
+            continue
+        if now - since >= grace_sec:
+            shutil.rmtree(gen, ignore_errors=True)
+            removed.append(gen)
+    return removed
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.atomic_file import atomic_write
+
+from .wheel_generations import CURRENT
+
+__all__ = [
+    "MANIFEST",
+    "write_manifest",
+    "AliasTable",
+    "Manifest",
+    "ManifestCache",
+]
+
+# File name of the index written next to the videos of one generation
+MANIFEST: str = "manifest.json"
+
+
+# ---------------------------------------------------------------------------
+# Writing – one JSON document per rendered batch
+# ---------------------------------------------------------------------------
+
+def write_manifest(
+    dest_dir: pathlib.Path,
+    *,
+    group: str,
+    version: str,
+    kind: str,
+    videos: Sequence[Dict[str, Any]],
+) -> pathlib.Path:
+    """Atomically (tmp + rename) write *dest_dir*/``manifest.json``.
+
+    Every entry of *videos* holds ``file`` (relative to *dest_dir*), ``name``
+    (the student the spin lands on), ``prob`` (sampling weight) and
+    ``angle`` (landing angle, CW deg).
+    """
+    doc = {"group": group, "version": version, "kind": kind, "videos": list(videos)}
+    path = dest_dir / MANIFEST
+    atomic_write(path, json.dumps(doc, ensure_ascii=False, indent=1))
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Sampling – Walker / Vose alias method
+# ---------------------------------------------------------------------------
+
+class AliasTable:
+    """O(1) sampling from a fixed discrete distribution (Vose's alias method)."""
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        n = len(weights)
+        if n == 0:
+            raise ValueError("alias table needs at least one weight")
+        total = float(sum(w for w in weights if w > 0))
+        if total <= 0:
+            scaled = [1.0] * n  # all weights empty → uniform
+        else:
+            scaled = [max(w, 0.0) * n / total for w in weights]
+
+        self.prob: List[float] = [0.0] * n
+        self.alias: List[int] = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            lo, hi = small.pop(), large.pop()
+            self.prob[lo] = scaled[lo]
+            self.alias[lo] = hi
+            scaled[hi] -= 1.0 - scaled[lo]
+            (small if scaled[hi] < 1.0 else large).append(hi)
+        for i in small + large:  # leftovers are 1 up to rounding
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, rng: random.Random | None = None) -> int:
+        u = (rng or random).random() * len(self.prob)
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+
+# ---------------------------------------------------------------------------
+# Reading – parsed manifest + alias table, reloaded only on change
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Manifest:
+    group: str
+    version: str
+    base: pathlib.Path                 # resolved directory of the videos
+    files: Tuple[pathlib.Path, ...]
+    names: Tuple[str, ...]
+    table: AliasTable
+
+    def pick(self, rng: random.Random | None = None) -> Tuple[pathlib.Path, str]:
+        """Random video (by manifest weight) and the student it lands on."""
+        i = self.table.sample(rng)
+        return self.files[i], self.names[i]
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "Manifest":
+        doc = json.loads(path.read_text(encoding="utf-8"))
+        videos = doc["videos"]
+        # Resolve once: after a later switch‑over the picked paths still
+        # point at the batch this manifest described.
+        base = path.resolve().parent
+        return cls(
+            group=doc["group"],
+            version=doc["version"],
+            base=base,
+            files=tuple(base / v["file"] for v in videos),
+            names=tuple(v["name"] for v in videos),
+            table=AliasTable([float(v["prob"]) for v in videos]),
+        )
+
+
+class ManifestCache:
+    """Per‑group :class:`Manifest`, re‑read only when the file changes.
+
+    A lookup costs one ``stat`` of the manifest; the JSON is parsed and the
+    alias table rebuilt only when inode, size or mtime differ (a generation
+    switch‑over always changes the inode).
+    """
+
+    def __init__(self, root: str | pathlib.Path = "videos") -> None:
+        self.root = pathlib.Path(root)
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Tuple[tuple, Manifest]] = {}
+
+    def path(self, group: str) -> pathlib.Path:
+        live = self.root / group / CURRENT / MANIFEST
+        return live if live.exists() else self.root / group / MANIFEST  # flat layout
+
+    def get(self, group: str) -> Optional[Manifest]:
+        path = self.path(group)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            cached = self._cache.get(group)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            manifest = Manifest.load(path)
+        except (OSError, ValueError, KeyError):
+            return None if cached is None else cached[1]
+        with self._lock:
+            self._cache[group] = (stamp, manifest)
+        return manifest
@@ -1,59 +1,104 @@
 from __future__ import annotations
 import random, math
+from dataclasses import dataclass
 from typing import Callable, Tuple
+
+import numpy as np
+
 from . import wheel_config as cfg
 
-__all__ = ["angular_motion"]
+__all__ = ["angular_motion", "spin_profile", "SpinProfile"]
 
 _secure_rand = random.SystemRandom()
 
-def angular_motion() -> Tuple[Callable[[float], float], float]:
 
-    # ------------------------- random phase lengths -------------------------
-    const_ms = _secure_rand.uniform(0.0, cfg.CONST_MAX_MS)  # ms
+@dataclass(frozen=True)
+class SpinProfile:
+    """Phase lengths (s) and peak speed (rad/s) of one spin."""
 
-    # Convert to seconds for the math below
-    accel_s = cfg.ACCEL_MS / 1000.0
-    const_s = const_ms        / 1000.0
-    decel_s = cfg.DECEL_MS / 1000.0
+    accel_s: float
+    const_s: float
+    decel_s: float
+    w_max: float
 
-    # Peak angular velocity (cfg is rad/ms, convert → rad/s)
-    w_max = cfg.MAX_OMG_MS * 1000.0
+    @property
+    def duration(self) -> float:
+        return self.accel_s + self.const_s + self.decel_s
 
     # ----------------------- pre‑integrate distances ------------------------
-    # θ during acceleration (∫0→acc αt dt) where α = w_max / accel_s
-    ang_accel = 0.5 * w_max * accel_s
+    @property
+    def ang_accel(self) -> float:
+        # θ during acceleration (∫0→acc αt dt) where α = w_max / accel_s
+        return 0.5 * self.w_max * self.accel_s
 
-    # θ during constant speed
-    ang_const = w_max * const_s
+    @property
+    def ang_const(self) -> float:
+        # θ during constant speed
+        return self.w_max * self.const_s
 
-    # θ during decel (∫0→1 w_max·(1 − p)²·dec_s dp) = w_max*dec_s/3
-    ang_decel = w_max * decel_s / 3.0
-
-    duration = accel_s + const_s + decel_s
+    @property
+    def ang_decel(self) -> float:
+        # θ during decel (∫0→1 w_max·(1 − p)²·dec_s dp) = w_max*dec_s/3
+        return self.w_max * self.decel_s / 3.0
 
     # -------------------------- main angle func ----------------------------
-    def angle_at(t: float) -> float:
+    def angle_at(self, t: float) -> float:
         """Cumulative CW angle at time ``t`` (seconds)."""
         if t <= 0.0:
             return 0.0
 
+        accel_s, const_s, decel_s, w_max = self.accel_s, self.const_s, self.decel_s, self.w_max
+
         # Acceleration phase (quadratic ease‑in)
         if t < accel_s:
             return 0.5 * w_max / accel_s * t * t
 
         # Constant speed
         if t < accel_s + const_s:
-            return ang_accel + w_max * (t - accel_s)
+            return self.ang_accel + w_max * (t - accel_s)
 
         # Deceleration (cubic ease‑out)
-        if t < duration:
+        if t < self.duration:
             td = t - accel_s - const_s   # time inside decel phase
             p  = td / decel_s            # normalised 0→1
             # θ = ang_accel + ang_const + w_max*dec_s * (1 - (1 - p)^3) / 3
-            return ang_accel + ang_const + w_max * decel_s * (1 - (1 - p) ** 3) / 3.0
+            return self.ang_accel + self.ang_const + w_max * decel_s * (1 - (1 - p) ** 3) / 3.0
 
         # After finished – clamp to final angle
-        return ang_accel + ang_const + ang_decel
+        return self.ang_accel + self.ang_const + self.ang_decel
+
+    def angles_at(self, ts: np.ndarray) -> np.ndarray:
+        """Vectorised :meth:`angle_at` for a whole array of times (rad)."""
+        t = np.asarray(ts, dtype=np.float64)
+        accel_s, const_s, decel_s, w_max = self.accel_s, self.const_s, self.decel_s, self.w_max
+
+        p = np.clip((t - accel_s - const_s) / decel_s, 0.0, 1.0)
+        decel = self.ang_accel + self.ang_const + w_max * decel_s * (1 - (1 - p) ** 3) / 3.0
+        const = self.ang_accel + w_max * (t - accel_s)
+        accel = 0.5 * w_max / accel_s * t * t
 
-    return angle_at, duration
+        out = np.where(t < accel_s + const_s, const, decel)
+        out = np.where(t < accel_s, accel, out)
+        return np.where(t <= 0.0, 0.0, out)
+
+
+def spin_profile(rng: random.Random | None = None) -> SpinProfile:
+    """Draw a random constant‑speed phase and return the resulting profile."""
+    if rng is None:
+        rng = _secure_rand
+
+    # ------------------------- random phase lengths -------------------------
+    const_ms = rng.uniform(0.0, cfg.CONST_MAX_MS)  # ms
+
+    # Convert to seconds; peak angular velocity (cfg is rad/ms, convert → rad/s)
+    return SpinProfile(
+        accel_s=cfg.ACCEL_MS / 1000.0,
+        const_s=const_ms / 1000.0,
+        decel_s=cfg.DECEL_MS / 1000.0,
+        w_max=cfg.MAX_OMG_MS * 1000.0,
+    )
+
+
+def angular_motion() -> Tuple[Callable[[float], float], float]:
+    profile = spin_profile()
+    return profile.angle_at, profile.duration
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable
+
+import numpy as np
+from PIL import Image
+
+__all__ = [
+    "PolarRotator",
+    "pil_frame",
+    "compare_with_pil",
+]
+
+# ---------------------------------------------------------------------------
+# Texture resolution
+# ---------------------------------------------------------------------------
+N_THETA: int = 8192        # angular samples per turn (power of two → cheap wrap)
+RADIAL_STEP: float = 0.5   # texture row spacing in *source* pixels
+BACKGROUND: tuple[int, int, int] = (255, 255, 255)
+
+_FIX_BITS: int = 8         # fixed‑point fraction bits for the angular index
+_FIX_ONE: int = 1 << _FIX_BITS
+_TEX_CHUNK_ROWS: int = 32  # texture rows resampled per batch (bounds peak memory)
+
+
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+
+def _premultiplied(img: Image.Image) -> np.ndarray:
+    """RGBA image → float32 array with premultiplied RGB (0‑255) and alpha (0‑1)."""
+    arr = np.asarray(img.convert("RGBA"), dtype=np.float32)
+    alpha = arr[..., 3:4] / 255.0
+    return np.concatenate([arr[..., :3] * alpha, alpha], axis=-1)
+
+
+def _bilinear(src: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Sample *src* (H, W, C) at continuous coords; pixel *i* spans [i, i+1).
+
+    Everything outside the image is treated as fully transparent (zeros),
+    which mirrors what ``Image.rotate`` does with the exposed corners.
+    """
+    h, w = src.shape[:2]
+    padded = np.zeros((h + 2, w + 2, src.shape[2]), dtype=np.float32)
+    padded[1:-1, 1:-1] = src
+
+    # +1 for the padding, −0.5 to move from pixel edges to pixel centres
+    fx = np.clip(xs + 0.5, 0.0, w + 1.0 - 1e-4)
+    fy = np.clip(ys + 0.5, 0.0, h + 1.0 - 1e-4)
+    x0 = fx.astype(np.int32)
+    y0 = fy.astype(np.int32)
+    ax = (fx - x0)[..., None]
+    ay = (fy - y0)[..., None]
+
+    top = padded[y0, x0] * (1.0 - ax) + padded[y0, x0 + 1] * ax
+    bot = padded[y0 + 1, x0] * (1.0 - ax) + padded[y0 + 1, x0 + 1] * ax
+    return top * (1.0 - ay) + bot * ay
+
+
+def _pack_rgbx(rgb: np.ndarray) -> np.ndarray:
+    """Float RGB (…, 3) → uint32 (…) holding R, G, B, 0 bytes in memory order."""
+    u8 = np.clip(rgb + 0.5, 0, 255).astype(np.uint8)
+    packed = np.zeros(u8.shape[:-1] + (4,), dtype=np.uint8)
+    packed[..., :3] = u8
+    return packed.view(np.uint32)[..., 0]
+
+
+def _unpack_rgbx(packed: np.ndarray) -> np.ndarray:
+    return packed.view(np.uint8).reshape(-1, 4)[:, :3].astype(np.float32)
+
+
+# ---------------------------------------------------------------------------
+# Public – polar rotation engine
+# ---------------------------------------------------------------------------
+
+class PolarRotator:
+    """Render ``white ← rotating layer ← static overlay`` frames at *size_px*.
+
+    The rotating layer is composited onto the background and resampled once
+    into a polar texture (radius × angle).  Every output pixel keeps a fixed
+    radius row and a fixed polar angle, so a frame is a single gather along
+    the angular axis shifted by the current rotation.  Only pixels inside the
+    wheel disc are touched; everything else is the pre‑composited static
+    background, and the (few) pixels under the semi‑transparent overlay are
+    blended in float.
+    """
+
+    def __init__(
+        self,
+        rot_img: Image.Image,
+        ovl_img: Image.Image,
+        size_px: int,
+        *,
+        n_theta: int = N_THETA,
+        radial_step: float = RADIAL_STEP,
+        background: tuple[int, int, int] = BACKGROUND,
+    ) -> None:
+        if n_theta & (n_theta - 1):
+            raise ValueError("n_theta must be a power of two")
+
+        rot = _premultiplied(rot_img)
+        src_h, src_w = rot.shape[:2]
+        cx, cy = src_w / 2.0, src_h / 2.0
+        bg = np.asarray(background, dtype=np.float32)
+
+        # ---- polar texture of ``background ← layer`` (packed RGBX) ---------
+        # Only radii that ever hold an opaque pixel are needed (the wheel
+        # disc); rows are resampled in chunks to keep peak memory small.
+        ys_opaque, xs_opaque = np.nonzero(rot[..., 3] > 0.0)
+        r_extent = (
+            float(np.hypot(xs_opaque + 0.5 - cx, ys_opaque + 0.5 - cy).max()) + 2.0
+            if xs_opaque.size else 0.0
+        )
+        n_r = int(math.ceil(r_extent / radial_step)) + 1
+        psi = np.arange(n_theta, dtype=np.float32) * (2.0 * math.pi / n_theta)
+        cos_psi, sin_psi = np.cos(psi)[None, :], np.sin(psi)[None, :]
+
+        self._tex = np.empty(n_r * n_theta, dtype=np.uint32)
+        for r0 in range(0, n_r, _TEX_CHUNK_ROWS):
+            radii = np.arange(r0, min(n_r, r0 + _TEX_CHUNK_ROWS), dtype=np.float32)[:, None]
+            radii *= radial_step
+            polar = _bilinear(rot, cx + radii * cos_psi, cy - radii * sin_psi)
+            layer = polar[..., :3] + (1.0 - polar[..., 3:4]) * bg
+            self._tex[r0 * n_theta:(r0 + radii.shape[0]) * n_theta] = _pack_rgbx(layer).ravel()
+
+        # ---- per‑output‑pixel lookup (radius row + polar angle column) -----
+        sx, sy = src_w / size_px, src_h / size_px
+        u = (np.arange(size_px, dtype=np.float32) + 0.5) * sx - cx
+        v = (np.arange(size_px, dtype=np.float32) + 0.5) * sy - cy
+        gx, gy = np.meshgrid(u, v)
+        r_idx = np.rint(np.hypot(gx, gy) / radial_step).astype(np.int32).ravel()
+        phi = (np.arctan2(-gy, gx) % (2.0 * math.pi)).ravel()  # CCW, screen orientation
+
+        # ---- static part: background with the overlay composited on top ----
+        ovl = _premultiplied(ovl_img.convert("RGBA").resize((size_px, size_px), Image.LANCZOS))
+        ovl = ovl.reshape(-1, 4)
+        keep = 1.0 - ovl[:, 3:4]
+        static = ovl[:, :3] + keep * bg
+        self._static = _pack_rgbx(static)
+
+        inside = r_idx < n_r
+        clear = inside & (ovl[:, 3] <= 0.0)        # layer shows through as is
+        mixed = inside & (ovl[:, 3] > 0.0) & (ovl[:, 3] < 1.0)
+        self._clear = np.flatnonzero(clear)
+        self._mixed = np.flatnonzero(mixed)
+        self._mixed_ovl = ovl[mixed, :3]
+        self._mixed_keep = keep[mixed]
+
+        # Column index in fixed point so the per‑frame work is integer only
+        scale = n_theta * _FIX_ONE / (2.0 * math.pi)
+        phi_fx = np.rint(phi * scale).astype(np.int64)
+        base = r_idx.astype(np.int64) * n_theta
+        self._clear_phi = phi_fx[self._clear]
+        self._clear_base = base[self._clear]
+        self._mixed_phi = phi_fx[self._mixed]
+        self._mixed_base = base[self._mixed]
+
+        self.size_px = size_px
+        self.n_theta = n_theta
+
+    # ------------------------------------------------------------------
+    def _gather(self, phi_fx: np.ndarray, base: np.ndarray, offset_fx: int) -> np.ndarray:
+        col = ((phi_fx + (offset_fx + _FIX_ONE // 2)) >> _FIX_BITS) & (self.n_theta - 1)
+        return self._tex[base + col]
+
+    def frame(self, theta_cw: float) -> np.ndarray:
+        """RGB uint8 frame (size_px × size_px × 3) for clockwise rotation *theta_cw* (deg)."""
+        # Rotating the picture CW by θ means pixel at polar angle φ shows the
+        # texture at φ + θ (both measured counter‑clockwise).
+        offset_fx = int(round((theta_cw % 360.0) * self.n_theta * _FIX_ONE / 360.0))
+
+        out = self._static.copy()
+        out[self._clear] = self._gather(self._clear_phi, self._clear_base, offset_fx)
+        if self._mixed.size:
+            under = _unpack_rgbx(self._gather(self._mixed_phi, self._mixed_base, offset_fx))
+            out[self._mixed] = _pack_rgbx(self._mixed_ovl + self._mixed_keep * under)
+
+        rgbx = out.view(np.uint8).reshape(self.size_px, self.size_px, 4)
+        return np.ascontiguousarray(rgbx[..., :3])
+
+
+# ---------------------------------------------------------------------------
+# Public – reference PIL path + accuracy check
+# ---------------------------------------------------------------------------
+
+def pil_frame(
+    rot_img: Image.Image,
+    ovl_img: Image.Image,
+    theta_cw: float,
+    size_px: int,
+) -> np.ndarray:
+    """The original rotate → composite → LANCZOS resize pipeline (reference)."""
+    w, h = rot_img.size
+    frame = Image.new("RGBA", (w, h), "white")
+    frame = Image.alpha_composite(frame, rot_img.rotate(-theta_cw, resample=Image.BICUBIC))
+    frame = Image.alpha_composite(frame, ovl_img)
+    frame = frame.convert("RGB").resize((size_px, size_px), Image.LANCZOS)
+    return np.array(frame)
+
+
+def compare_with_pil(
+    rot_img: Image.Image,
+    ovl_img: Image.Image,
+    size_px: int,
+    angles: Iterable[float] = (0.0, 13.7, 90.0, 181.3, 271.9, 359.95),
+    *,
+    rotator: PolarRotator | None = None,
+) -> Dict[str, float]:
+    """Mean / max absolute error and PSNR of the polar engine vs :func:`pil_frame`."""
+    if rotator is None:
+        rotator = PolarRotator(rot_img, ovl_img, size_px)
+
+    mean_err: list[float] = []
+    max_err = 0.0
+    mse: list[float] = []
+    for theta in angles:
+        ref = pil_frame(rot_img, ovl_img, theta, size_px).astype(np.float32)
+        got = rotator.frame(theta).astype(np.float32)
+        diff = np.abs(ref - got)
+        mean_err.append(float(diff.mean()))
+        max_err = max(max_err, float(diff.max()))
+        mse.append(float((diff ** 2).mean()))
+
+    avg_mse = sum(mse) / len(mse)
+    return {
+        "mean_abs": sum(mean_err) / len(mean_err),
+        "max_abs": max_err,
+        "psnr_db": float("inf") if avg_mse == 0 else 10.0 * math.log10(255.0 ** 2 / avg_mse),
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI helper – accuracy check against the PIL path for a real group
+# ---------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import io
+    import sys
+
+    from .wheel_draw import draw_rotating_layer, draw_static_overlay
+    from .wheel_snapshot import take_snapshot
+
+    parser = argparse.ArgumentParser(description="Compare polar engine frames with the PIL path.")
+    parser.add_argument("group", help="student group id (e.g. ft-204-1)")
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--min-psnr", type=float, default=35.0)
+    args = parser.parse_args()
+
+    rot = Image.open(io.BytesIO(draw_rotating_layer(take_snapshot(args.group)))).convert("RGBA")
+    ovl = Image.open(io.BytesIO(draw_static_overlay())).convert("RGBA")
+    report = compare_with_pil(rot, ovl, args.size)
+    print(
+        f"[polar] mean |Δ| = {report['mean_abs']:.3f}, max |Δ| = {report['max_abs']:.0f}, "
+        f"PSNR = {report['psnr_db']:.2f} dB"
+    )
+    sys.exit(0 if report["psnr_db"] >= args.min_psnr else 1)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import pathlib
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, TypeVar
+
+try:
+    import resource
+except ImportError:  # pragma: no cover – Windows: no rusage / peak RSS
+    resource = None  # type: ignore[assignment]
+
+__all__ = [
+    "RenderProfiler",
+    "NULL_PROFILER",
+    "group_report",
+    "summarize",
+    "write_report",
+]
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _rusage(who: int) -> tuple[float, float]:
+    """(CPU seconds, peak RSS MiB) of this process or its reaped children."""
+    if resource is None:
+        return 0.0, 0.0
+    ru = resource.getrusage(who)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = ru.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return ru.ru_utime + ru.ru_stime, rss
+
+
+# ---------------------------------------------------------------------------
+# Per‑video profiler
+# ---------------------------------------------------------------------------
+
+class RenderProfiler:
+    """Wall / CPU time per named stage of one video render.
+
+    Stages may run on several threads at once (frame producers): each call
+    adds its own wall and thread‑CPU time, so a stage's wall total is
+    *busy* time summed over threads, not elapsed time.  ffmpeg's CPU and
+    peak RSS are reported by the encoder (children rusage is useless for
+    RSS: a forked child starts with its parent's footprint).
+    """
+
+    enabled = True
+
+    def __init__(self, label: str = "") -> None:
+        self.label = label
+        self.stages: Dict[str, List[float]] = {}   # name → [wall, cpu, calls]
+        self.counters: Dict[str, int] = {}
+        self.peaks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._child_cpu0 = _rusage(resource.RUSAGE_CHILDREN)[0] if resource else 0.0
+
+    def _add(self, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            acc = self.stages.setdefault(name, [0.0, 0.0, 0])
+            acc[0] += wall
+            acc[1] += cpu
+            acc[2] += 1
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self._add(name, time.perf_counter() - t0, time.thread_time() - c0)
+
+    def wrap(self, name: str, fn: F) -> F:
+        """*fn* with every call timed as stage *name*."""
+        @functools.wraps(fn)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            t0, c0 = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._add(name, time.perf_counter() - t0, time.thread_time() - c0)
+
+        return timed  # type: ignore[return-value]
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def peak(self, name: str, value: float) -> None:
+        with self._lock:
+            self.peaks[name] = max(self.peaks.get(name, 0.0), value)
+
+    def report(self) -> Dict[str, Any]:
+        wall = time.perf_counter() - self._t0
+        self_cpu = time.process_time() - self._cpu0
+        if resource is not None:
+            child_cpu = _rusage(resource.RUSAGE_CHILDREN)[0]
+            self_rss = _rusage(resource.RUSAGE_SELF)[1]
+        else:
+            child_cpu = self_rss = 0.0
+        frames = self.counters.get("frames_out", 0)
+        return {
+            "label": self.label,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(self_cpu, 4),
+            "encoder_cpu_s": round(child_cpu - self._child_cpu0, 4),
+            "fps": round(frames / wall, 2) if wall > 0 else 0.0,
+            "peak_rss_mb": round(self_rss, 1),
+            "encoder_peak_rss_mb": round(self.peaks.get("encoder_rss_mb", 0.0), 1),
+            "counters": dict(self.counters),
+            "stages": {
+                name: {"wall_s": round(w, 4), "cpu_s": round(c, 4), "calls": n}
+                for name, (w, c, n) in self.stages.items()
+            },
+        }
+
+
+class _NullProfiler:
+    """Disabled profiler: every hook is a constant‑time no‑op."""
+
+    enabled = False
+    _ctx = contextlib.nullcontext()
+
+    def stage(self, name: str) -> contextlib.nullcontext:
+        return self._ctx
+
+    def wrap(self, name: str, fn: F) -> F:
+        return fn
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+    def peak(self, name: str, value: float) -> None:
+        pass
+
+
+NULL_PROFILER: Any = _NullProfiler()
+
+
+# ---------------------------------------------------------------------------
+# Group report
+# ---------------------------------------------------------------------------
+
+def group_report(
+    group: str,
+    version: str,
+    group_profiler: RenderProfiler,
+    videos: List[Dict[str, Any]],
+    **extra: Any,
+) -> Dict[str, Any]:
+    """Combine the group‑level stages with every per‑video report."""
+    totals: Dict[str, Dict[str, float]] = {}
+    for video in videos:
+        for name, st in video["stages"].items():
+            acc = totals.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0})
+            for key in acc:
+                acc[key] += st[key]
+    own = group_profiler.report()
+    frames = sum(v["counters"].get("frames_out", 0) for v in videos)
+    return {
+        "group": group,
+        "version": version,
+        **extra,
+        "wall_s": own["wall_s"],
+        "fps": round(frames / own["wall_s"], 2) if own["wall_s"] > 0 else 0.0,
+        "peak_rss_mb": max([own["peak_rss_mb"]] + [v["peak_rss_mb"] for v in videos]),
+        "encoder_peak_rss_mb": max([0.0] + [v["encoder_peak_rss_mb"] for v in videos]),
+        "stages": own["stages"],
+        "video_totals": {
+            name: {k: round(v, 4) for k, v in acc.items()} for name, acc in totals.items()
+        },
+        "encoder_cpu_s": round(sum(v["encoder_cpu_s"] for v in videos), 4),
+        "videos": videos,
+    }
+
+
+def summarize(report: Dict[str, Any]) -> str:
+    """Readable table of a :func:`group_report`."""
+    lines = [
+        f"[profile] {report['group']} ({report['version']}): {len(report['videos'])} videos "
+        f"in {report['wall_s']:.1f}s, {report['fps']:.1f} output fps, "
+        f"peak RSS {report['peak_rss_mb']:.0f} MiB (encoder {report['encoder_peak_rss_mb']:.0f} MiB)",
+        f"  {'stage':<22}{'wall s':>10}{'cpu s':>10}{'calls':>8}",
+    ]
+    for scope in ("stages", "video_totals"):
+        for name, st in sorted(report[scope].items(), key=lambda kv: -kv[1]["wall_s"]):
+            prefix = "" if scope == "stages" else "video/"
+            lines.append(f"  {prefix + name:<22}{st['wall_s']:>10.2f}{st['cpu_s']:>10.2f}{st['calls']:>8}")
+    lines.append(f"  {'video/x264 (ffmpeg)':<22}{'':>10}{report['encoder_cpu_s']:>10.2f}")
+    return "\n".join(lines)
+
+
+def write_report(path: str | pathlib.Path, report: Dict[str, Any]) -> None:
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
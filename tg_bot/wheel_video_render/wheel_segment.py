@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import bisect
 import random
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Sequence, Tuple
 
-from .wheel_helpers import fetch_students, weights
+if TYPE_CHECKING:  # pragma: no cover – import only for annotations
+    from .wheel_snapshot import GroupSnapshot
 
 __all__ = [
     "segment_bounds",
     "segment_mid",
     "random_angle_in_segment",
+    "winner_for_angle",
 ]
 
 # ---------------------------------------------------------------------------
@@ -29,23 +32,19 @@ def _cumulative(fracs: List[float]) -> List[float]:
 # Public geometry API
 # ---------------------------------------------------------------------------
 
-def segment_bounds(group: str) -> List[Tuple[float, float]]:
-    """Return clockwise degree bounds for every student of *group*."""
-    students = fetch_students(group)
-    probs    = weights(students)  # list of fractions that sum ≈ 1.0
+def segment_bounds(snapshot: GroupSnapshot) -> List[Tuple[float, float]]:
+    """Return clockwise degree bounds for every student of *snapshot*."""
+    return list(snapshot.bounds)
 
-    cum = _cumulative(probs)
-    return [(s * 360.0, e * 360.0) for s, e in zip(cum[:-1], cum[1:])]
 
-
-def segment_mid(group: str, idx: int) -> float:
-    """Centre angle (CW deg) of wedge *idx*."""
-    start, end = segment_bounds(group)[idx]
+def segment_mid(snapshot: GroupSnapshot, idx: int) -> float:
+    """Centre angle (CW deg) of wedge *idx*."""
+    start, end = snapshot.bounds[idx]
     return (start + end) / 2.0
 
 
 def random_angle_in_segment(
-    group: str,
+    snapshot: GroupSnapshot,
     idx: int,
     *,
     rng: random.Random | None = None,
@@ -55,7 +54,7 @@ def random_angle_in_segment(
     if rng is None:
         rng = random.SystemRandom()
 
-    start, end = segment_bounds(group)[idx]
+    start, end = snapshot.bounds[idx]
     span = end - start
     margin = min(margin_deg, span * margin_frac)
 
@@ -64,3 +63,12 @@ def random_angle_in_segment(
         return (start + end) / 2.0
 
     return rng.uniform(start + margin, end - margin)
+
+
+def winner_for_angle(starts: Sequence[float], angle_cw: float) -> int:
+    """Index of the wedge containing *angle_cw* (CW deg) – O(log n) bisect.
+
+    *starts* are the sorted start angles of :func:`segment_bounds`.
+    """
+    idx = bisect.bisect_right(starts, angle_cw % 360.0) - 1
+    return min(max(idx, 0), len(starts) - 1)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from .wheel_helpers import fetch_students, weights
+from .wheel_segment import _cumulative
+
+__all__ = [
+    "GroupSnapshot",
+    "take_snapshot",
+]
+
+
+# ---------------------------------------------------------------------------
+# Immutable per‑group data used by one whole render run
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class GroupSnapshot:
+    """Students, wedge weights and bounds of *group* frozen at fetch time.
+
+    Everything the renderer needs is derived from a single download, so
+    wedges, labels and filenames of one run always describe the same data.
+    """
+
+    group: str
+    names: Tuple[str, ...]
+    scores: Tuple[float, ...]
+    weights: Tuple[float, ...]                 # wedge fractions, sum ≈ 1.0
+    bounds: Tuple[Tuple[float, float], ...]    # clockwise degree bounds
+    source_hash: str                           # sha256 of the parsed rows
+    fetched_at: float
+
+    @classmethod
+    def from_students(
+        cls,
+        group: str,
+        students: Sequence[Dict[str, float]],
+        *,
+        fetched_at: float | None = None,
+    ) -> "GroupSnapshot":
+        names = tuple(str(s["name"]) for s in students)
+        scores = tuple(float(s["score"]) for s in students)
+        probs = tuple(weights(list(students))) if students else ()
+
+        cum = _cumulative(list(probs))
+        bounds = tuple((s * 360.0, e * 360.0) for s, e in zip(cum[:-1], cum[1:]))
+
+        payload = json.dumps(list(zip(names, scores)), ensure_ascii=False)
+        return cls(
+            group=group,
+            names=names,
+            scores=scores,
+            weights=probs,
+            bounds=bounds,
+            source_hash=hashlib.sha256(payload.encode("utf-8")).hexdigest(),
+            fetched_at=time.time() if fetched_at is None else fetched_at,
+        )
+
+    @property
+    def version(self) -> str:
+        """Short, filesystem‑friendly identifier of the data version."""
+        return self.source_hash[:12]
+
+    @property
+    def students(self) -> List[Dict[str, float]]:
+        """Fresh ``[{"name", "score"}]`` list (callers may mutate it freely)."""
+        return [{"name": n, "score": s} for n, s in zip(self.names, self.scores)]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def take_snapshot(group: str) -> GroupSnapshot:
+    """Fetch *group* once and freeze it into a :class:`GroupSnapshot`."""
+    return GroupSnapshot.from_students(group, fetch_students(group))